@@ -0,0 +1,89 @@
+import time
+
+import src.planning.multi_max as multi_max
+import tests.board_builder as board_builder
+from src.planning.bitboard_simulation import BitboardSimulation
+from src.planning.transposition import TranspositionTable
+
+# Positions only repeat once every snake's body can be the same after two
+# different sequences of moves. That takes more turns than the snakes are
+# long, so the table pays off in deep duel searches and barely ever hits in
+# shallow four snake ones.
+BOARDS = {
+    "four snakes, depth 3": (
+        """
+        ...........
+        ..>>a......
+        ...........
+        ...........
+        .......c<<.
+        ...........
+        ..>>d......
+        ...........
+        ......b<<..
+        .*.........
+        ...........
+        """,
+        {"a": 90, "b": 90, "c": 90, "d": 90},
+        3,
+    ),
+    "duel, depth 6": (
+        """
+        ...........
+        ...........
+        ...........
+        ..>>a......
+        ...........
+        ...........
+        ...........
+        ......b<<..
+        ...........
+        .*.........
+        ...........
+        """,
+        {"a": 90, "b": 90},
+        6,
+    ),
+    "short duel, depth 6": (
+        """
+        ...........
+        ...........
+        ...........
+        ...>a......
+        ...........
+        ...........
+        ...........
+        ......b<...
+        ...........
+        .*.........
+        ...........
+        """,
+        {"a": 90, "b": 90},
+        6,
+    ),
+}
+
+
+def timed_search(board, depth: int, table: TranspositionTable | None):
+    sim = BitboardSimulation(board, max_depth=depth)
+    start = time.monotonic()
+    root = multi_max.SnakeDecision.make_tree(sim, depth, table=table)
+    return root.get_best_direction(), (time.monotonic() - start) * 1000
+
+
+def main():
+    for name, (board_str, healths, depth) in BOARDS.items():
+        board = board_builder.BoardBuilder(board_str, healths).to_board()
+        direction, plain_ms = timed_search(board, depth, None)
+        table = TranspositionTable()
+        table_direction, table_ms = timed_search(board, depth, table)
+        assert table_direction is direction
+        lookups = table.hits + table.misses
+        print(
+            f"{name}: {plain_ms:.0f}ms without the table, {table_ms:.0f}ms with"
+            f" it, {table.hits}/{lookups} lookups hit"
+        )
+
+
+if __name__ == "__main__":
+    main()
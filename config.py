@@ -1,2 +1,5 @@
 # Should we keep debug information about how the decision was made?
 DEBUG = False
+
+# How much of the game's move timeout to leave for the network, in ms.
+NETWORK_MARGIN_MS = 150
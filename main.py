@@ -6,9 +6,15 @@ from typing import Mapping
 import cherrypy
 
 from src.snakes.default import BattlesnakeServer
+from src.snakes.duncan import Duncan
 from src.snakes.igor import Igor
 from src.snakes.samuel import Samuel
 from src.snakes.medusa import Medusa
+from src.snakes.monty import Monty
+from src.snakes.ulysses import Ulysses
+from src.planning.parallel import ParallelSearch
+from src.snakes import samuel
+from src.snakes.worker_pool import WorkerPool
 
 """
 This is a simple Battlesnake server written in Python.
@@ -16,17 +22,29 @@ For instructions see https://github.com/BattlesnakeOfficial/starter-snake-python
 """
 
 
-def snake_servers() -> Mapping[str, BattlesnakeServer]:
+def snake_servers(
+    parallel_search: ParallelSearch | None = None,
+    worker_pool: WorkerPool | None = None,
+) -> Mapping[str, BattlesnakeServer]:
     """Return all the snake servers this webserver should host
 
+    Args:
+        parallel_search (ParallelSearch | None): Worker pool for the snakes
+            that can split their search over processes.
+        worker_pool (WorkerPool | None): Worker pool for Samuel to run each
+            move's search in.
+
     Returns:
         Mapping[str, BattlesnakeServer]: A mapping from the mount point to the
             server object that should be hosted there.
     """
     return {
-        "/samuel": Samuel(),
+        "/samuel": Samuel(parallel_search=parallel_search, worker_pool=worker_pool),
         "/igor": Igor(),
         "/medusa": Medusa(),
+        "/duncan": Duncan(),
+        "/monty": Monty(),
+        "/ulysses": Ulysses(),
     }
 
 
@@ -44,10 +62,14 @@ def config_cherrypy(port: int, auto_reload: bool):
 def main(argv):
     auto_reload = False
     port = 80
+    workers = 0
+    pool_size = 0
     try:
-        opts, args = getopt.getopt(argv, "p:r", ["port=", "auto_reload"])
+        opts, args = getopt.getopt(
+            argv, "p:rw:s:", ["port=", "auto_reload", "workers=", "pool_size="]
+        )
     except getopt.GetoptError:
-        print("main.py --port 8080 --auto_reload")
+        print("main.py --port 8080 --auto_reload --workers 4 --pool_size 4")
 
     print(opts)
     for opt, arg in opts:
@@ -55,9 +77,23 @@ def main(argv):
             port = int(arg)
         elif opt in ("-r", "--auto_reload"):
             auto_reload = True
+        elif opt in ("-w", "--workers"):
+            workers = int(arg)
+        elif opt in ("-s", "--pool_size"):
+            pool_size = int(arg)
     config_cherrypy(port, auto_reload)
 
-    for mnt, snk in snake_servers().items():
+    # Start the workers now, so no move has to wait for them.
+    parallel_search = None
+    if workers > 0:
+        parallel_search = ParallelSearch(workers)
+        cherrypy.engine.subscribe("stop", parallel_search.close)
+    worker_pool = None
+    if pool_size > 0:
+        worker_pool = WorkerPool(samuel.search, pool_size)
+        cherrypy.engine.subscribe("stop", worker_pool.close)
+
+    for mnt, snk in snake_servers(parallel_search, worker_pool).items():
         cherrypy.tree.mount(snk, mnt)
 
     print("Starting Battlesnake Server...")
@@ -1,7 +1,7 @@
 import cProfile
 import tracemalloc
 
-from src.planning.fringe import TimedBFS, BoardState
+from src.planning.fringe import TimedBFS, DeltaBoardState
 from src.planning.simulation import Simulation
 from tests.board_builder import BoardBuilder
 
@@ -24,7 +24,7 @@ def actual_work():
         },
     ).to_board()
     sim = Simulation(board, max_depth=3)
-    root = BoardState(sim)
+    root = DeltaBoardState.root(sim)
     bfs = TimedBFS(root, 1000)
     bfs.run()
 
@@ -34,6 +34,9 @@ class BattlesnakeInfo:
 
 
 class Coord:
+    # Coords are treated as immutable, so they can be hashed and shared.
+    __slots__ = ("x", "y")
+
     def __init__(self, data: dict):
         self.x = data["x"]
         self.y = data["y"]
@@ -43,6 +46,15 @@ class Coord:
             return False
         return other.x == self.x and other.y == self.y
 
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+    def __copy__(self) -> "Coord":
+        return self
+
+    def __deepcopy__(self, memo) -> "Coord":
+        return self
+
     def __repr__(self):
         return f"<Coord({self.x}, {self.y})>"
 
@@ -109,6 +121,42 @@ class Battlesnake:
         self.squad = data["squad"] if "squad" in data else None
 
 
+class _GridColumn:
+    def __init__(self, tiles: bytearray, start: int, height: int):
+        self._tiles = tiles
+        self._start = start
+        self._height = height
+
+    def __len__(self):
+        return self._height
+
+    def __getitem__(self, y: int) -> Tile:
+        if not 0 <= y < self._height:
+            raise IndexError("grid index out of range")
+        return _TILES[self._tiles[self._start + y]]
+
+
+class _GridView:
+    """Read only grid[x][y] access to a Board's tiles."""
+
+    def __init__(self, tiles: bytearray, width: int, height: int):
+        self._tiles = tiles
+        self._width = width
+        self._height = height
+
+    def __len__(self):
+        return self._width
+
+    def __getitem__(self, x: int) -> _GridColumn:
+        if not 0 <= x < self._width:
+            raise IndexError("grid index out of range")
+        return _GridColumn(self._tiles, x * self._height, self._height)
+
+
+# Tiles by value, for decoding Board.tiles.
+_TILES = sorted(Tile, key=lambda tile: tile.value)
+
+
 class Board:
     def __init__(self, data: dict):
         # data fields
@@ -119,42 +167,76 @@ class Board:
         self.snakes = [Battlesnake(snk) for snk in data["snakes"]]
 
         # custom fields
-        self.grid = [
-            [Tile.EMPTY for _ in range(self.height)] for _ in range(self.width)
-        ]
-        for fd in self.food:
-            self.grid[fd.x][fd.y] = Tile.FOOD
-
-        for hzd in self.hazards:
-            self.grid[hzd.x][hzd.y] = Tile.HAZARD
-
-        for snk in self.snakes:
-            for segment in snk.body:
-                self.grid[segment.x][segment.y] = Tile.SNAKE
+        # Built on first use, most snakes never look at it.
+        self._tiles = None
+
+    @property
+    def tiles(self) -> bytearray:
+        """Tile value of every cell, cell (x, y) is at x * height + y."""
+        if self._tiles is None:
+            h = self.height
+            tiles = bytearray([Tile.EMPTY.value]) * (self.width * h)
+            for fd in self.food:
+                tiles[fd.x * h + fd.y] = Tile.FOOD.value
+
+            for hzd in self.hazards:
+                tiles[hzd.x * h + hzd.y] = Tile.HAZARD.value
+
+            for snk in self.snakes:
+                for segment in snk.body:
+                    tiles[segment.x * h + segment.y] = Tile.SNAKE.value
+            self._tiles = tiles
+        return self._tiles
+
+    @property
+    def grid(self) -> _GridView:
+        """The tiles as grid[x][y]."""
+        return _GridView(self.tiles, self.width, self.height)
+
+    def _tile_value(self, x: int, y: int) -> int:
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return Tile.OUTSIDE.value
+        return self.tiles[x * self.height + y]
 
     def get(self, x: int, y: int) -> Tile:
-        if not (0 <= x < self.width and 0 <= y < self.height):
-            return Tile.OUTSIDE
-        else:
-            return self.grid[x][y]
+        return _TILES[self._tile_value(x, y)]
 
     def can_move(self, snk: Battlesnake, d: Direction) -> bool:
         x = snk.head.x + d.rel_x
         y = snk.head.y + d.rel_y
-        is_clear = self.get(x, y) in (Tile.EMPTY, Tile.FOOD)
+        is_clear = self._tile_value(x, y) in _CLEAR
         is_my_tail = snk.body[-1].x == x and snk.body[-1].y == y
         return is_clear or is_my_tail
 
     def can_safe_move(self, snk: Battlesnake, d: Direction) -> bool:
         x = snk.head.x + d.rel_x
         y = snk.head.y + d.rel_y
-        return self.get(x, y) in (Tile.EMPTY, Tile.FOOD)
+        return self._tile_value(x, y) in _CLEAR
+
+
+# Tile values a snake can move onto.
+_CLEAR = (Tile.EMPTY.value, Tile.FOOD.value)
+
+
+class RulesetSettings:
+    """The parts of a ruleset's settings that change how a game plays out.
+
+    Anything missing gets the standard ruleset's default.
+    """
+
+    def __init__(self, data: dict):
+        self.food_spawn_chance = data.get("foodSpawnChance", 15)
+        self.minimum_food = data.get("minimumFood", 1)
+        self.hazard_damage_per_turn = data.get("hazardDamagePerTurn", 14)
+        # Royale only, 0 means the safe area never shrinks.
+        self.shrink_every_n_turns = data.get("royale", {}).get("shrinkEveryNTurns", 0)
 
 
 class Ruleset:
     def __init__(self, data: dict):
         self.name = data["name"]
         self.version = data["version"]
+        self.settings = RulesetSettings(data.get("settings", {}))
 
 
 class Game:
@@ -0,0 +1,267 @@
+from typing import List
+
+import numpy as np
+
+import src.models as models
+from src.planning import cells
+from src.planning.simulation import MAX_HEALTH, FoodSpawns, ParsedBoard, Rules
+
+# Random cells to try for each new food before looking for the empty ones.
+PLACEMENT_TRIES = 4
+
+
+class BatchSimulation:
+    """Many copies of one game, all advanced together with NumPy.
+
+    Each of the batch_size games starts from the same board, and step() plays
+    one turn in all of them at once, with a separate joint move for each game.
+    The rules are the same as Simulation.do_turn: snakes move, lose health,
+    take hazard damage, eat, new food appears, and then starving, out of
+    bounds, body and head-to-head snakes are eliminated. Dead snakes' bodies
+    stay on the board, like in Simulation. Unlike Simulation, the hazards never
+    spread, even if rules says the safe area shrinks. New food follows
+    rules.food_spawns, but lands on random empty cells drawn from rules.seed,
+    different in every game.
+
+    There is no undo. Copy the batch first if you need to go back.
+
+    Cells are indexed like cells.CellTable, so a head that moved out of bounds
+    still has a cell.
+
+    Attributes (game is the first axis of each array):
+    health: (batch, snakes) health of each snake, 0 if dead
+    lengths: (batch, snakes) body length, including stacked tail segments
+    heads: (batch, snakes) cell of each head
+    food: (batch, cells) whether there is food on the cell
+    occupancy: (batch, cells) body segments other than heads on each cell
+    """
+
+    def __init__(
+        self,
+        board: models.Board | ParsedBoard,
+        batch_size: int,
+        max_depth=32,
+        rules: Rules = Rules(),
+    ):
+        self.turn = 0
+        # Like Simulation, step() errors once turn == max_depth. This bounds how
+        # long a snake can grow, which sizes the body buffers.
+        self.max_depth = max_depth
+        self.batch_size = batch_size
+        self.width = board.width
+        self.height = board.height
+        self.names = [snk.name for snk in board.snakes]
+        self.snake_ids = list(range(len(board.snakes)))
+        self._cells = cells.cells_for(self.width, self.height)
+        self._on_board = np.array(self._cells.on_board, dtype=bool)
+        self._board_cells = np.flatnonzero(self._on_board)
+        self._offsets = np.array(self._cells.offsets, dtype=np.int32)
+
+        num_snakes = len(board.snakes)
+        num_cells = len(self._cells.coords)
+        max_length = max((len(snk.body) for snk in board.snakes), default=1)
+
+        # Each body is a ring buffer of cells. The head is at _head_slot and
+        # the rest of the body is at the slots before it, wrapping around.
+        self._capacity = max_length + max_depth + 1
+        ring = np.zeros((num_snakes, self._capacity), dtype=np.int32)
+        for snk_id, snk in enumerate(board.snakes):
+            # Stored tail first, so the head ends up at len(body) - 1
+            for slot, coord in enumerate(reversed(snk.body)):
+                ring[snk_id, slot] = self._cells.index(coord)
+        self._ring = np.repeat(ring[np.newaxis], batch_size, axis=0)
+        self.lengths = np.tile(
+            np.array([len(snk.body) for snk in board.snakes], dtype=np.int32),
+            (batch_size, 1),
+        )
+        self._head_slot = self.lengths - 1
+        self.heads = np.tile(
+            np.array(
+                [self._cells.index(snk.body[0]) for snk in board.snakes],
+                dtype=np.int32,
+            ),
+            (batch_size, 1),
+        )
+
+        self.health = np.tile(
+            np.array([snk.health for snk in board.snakes], dtype=np.int16),
+            (batch_size, 1),
+        )
+
+        food = np.zeros(num_cells, dtype=bool)
+        for f in board.food:
+            food[self._cells.index(f)] = True
+        self.food = np.tile(food, (batch_size, 1))
+
+        occupancy = np.zeros(num_cells, dtype=np.int16)
+        for snk in board.snakes:
+            for segment in snk.body[1:]:
+                occupancy[self._cells.index(segment)] += 1
+        self.occupancy = np.tile(occupancy, (batch_size, 1))
+
+        # Hazard damage on each cell. Stacked hazards do damage once per stack,
+        # like in Simulation.
+        self._hazard_damage = np.zeros(num_cells, dtype=np.int16)
+        damage = rules.hazard_damage_per_turn
+        for hazard in board.hazards:
+            self._hazard_damage[self._cells.index(hazard)] += damage
+        self._has_hazards = bool(self._hazard_damage.any())
+
+        self.rules = rules
+        self._rng = np.random.default_rng(rules.seed)
+
+    @property
+    def alive(self) -> np.ndarray:
+        return self.health > 0
+
+    def body(self, game: int, snk_id: int) -> List[models.Coord]:
+        """The body of one snake in one game, head first."""
+        slots = (
+            self._head_slot[game, snk_id] - np.arange(self.lengths[game, snk_id])
+        ) % self._capacity
+        return [self._cells.coords[i] for i in self._ring[game, snk_id, slots]]
+
+    def food_in(self, game: int) -> List[models.Coord]:
+        return [self._cells.coords[i] for i in np.flatnonzero(self.food[game])]
+
+    def safe_moves(self) -> np.ndarray:
+        """(batch, snakes, 4) whether each move, in CARDINAL_FOUR order, lands
+        on the board and off every body.
+
+        Tails count as bodies, even though they usually move out of the way.
+        Dead snakes have no safe moves.
+        """
+        targets = self.heads[:, :, np.newaxis] + self._offsets
+        # Dead heads can be out of bounds, so their targets may be off the
+        # padded board too.
+        np.clip(targets, 0, len(self._on_board) - 1, out=targets)
+        games = np.arange(self.batch_size)[:, np.newaxis, np.newaxis]
+        return (
+            self._on_board[targets]
+            & (self.occupancy[games, targets] == 0)
+            & (self.health > 0)[:, :, np.newaxis]
+        )
+
+    def step(self, moves: np.ndarray):
+        """Play one turn in every game.
+
+        Args:
+            moves (np.ndarray): (batch, snakes) index into CARDINAL_FOUR of
+                each snake's move. Dead snakes' moves are ignored.
+        """
+        if self.turn == self.max_depth:
+            raise AssertionError("Cannot call step when simulation is at max depth.")
+        moves = np.asarray(moves)
+        alive = self.health > 0
+        if np.any(moves[alive] < 0):
+            raise ValueError("Every live snake must submit a move.")
+        games, snakes = np.nonzero(alive)
+        capacity = self._capacity
+
+        # Move. The old head becomes a body segment and the old tail is gone.
+        old_heads = self.heads[games, snakes]
+        tail_slots = (
+            self._head_slot[games, snakes] - self.lengths[games, snakes] + 1
+        ) % capacity
+        old_tails = self._ring[games, snakes, tail_slots]
+        np.add.at(self.occupancy, (games, old_heads), 1)
+        np.add.at(self.occupancy, (games, old_tails), -1)
+        new_heads = old_heads + self._offsets[moves[games, snakes]]
+        head_slots = (self._head_slot[games, snakes] + 1) % capacity
+        self._ring[games, snakes, head_slots] = new_heads
+        self._head_slot[games, snakes] = head_slots
+        self.heads[games, snakes] = new_heads
+
+        # Every live snake loses one health
+        self.health[games, snakes] -= 1
+
+        # Hazards hurt, unless the snake is eating food on the hazard.
+        if self._has_hazards:
+            damage = np.where(
+                self.food[games, new_heads], 0, self._hazard_damage[new_heads]
+            )
+            self.health[games, snakes] = np.maximum(
+                self.health[games, snakes] - damage, 0
+            )
+
+        # Feed. Several snakes can eat the same food.
+        eats = self.food[games, new_heads]
+        eat_games = games[eats]
+        eat_snakes = snakes[eats]
+        if eat_games.size:
+            self.health[eat_games, eat_snakes] = MAX_HEALTH
+            self.food[eat_games, new_heads[eats]] = False
+            # Growing stacks a copy of the tail on itself
+            lengths = self.lengths[eat_games, eat_snakes]
+            slots = self._head_slot[eat_games, eat_snakes]
+            tails = self._ring[eat_games, eat_snakes, (slots - lengths + 1) % capacity]
+            self._ring[eat_games, eat_snakes, (slots - lengths) % capacity] = tails
+            self.lengths[eat_games, eat_snakes] += 1
+            np.add.at(self.occupancy, (eat_games, tails), 1)
+
+        if self.rules.food_spawns is not FoodSpawns.NONE:
+            self._spawnFood()
+
+        # Snakes that starve or go out of bounds die first
+        out = ~self._on_board[new_heads]
+        self.health[games[out], snakes[out]] = 0
+
+        # All remaining eliminations happen simultaneously. Heads are compared
+        # with every other snake, dead ones included, like Simulation.
+        survivors = self.health[games, snakes] > 0
+        collided = self.occupancy[games, new_heads] > 0
+        same_cell = self.heads[:, :, np.newaxis] == self.heads[:, np.newaxis, :]
+        same_cell[:, self.snake_ids, self.snake_ids] = False
+        not_shorter = self.lengths[:, np.newaxis, :] >= self.lengths[:, :, np.newaxis]
+        lost = np.any(same_cell & not_shorter, axis=2)[games, snakes]
+        dead = survivors & (collided | lost)
+        self.health[games[dead], snakes[dead]] = 0
+
+        self.turn += 1
+
+    def _spawnFood(self):
+        """Top up every game to the minimum food, then maybe add one more, the
+        same way Simulation decides how many to add."""
+        rules = self.rules
+        num_food = np.count_nonzero(self.food, axis=1)
+        spawn = np.maximum(rules.minimum_food - num_food, 0)
+        extra = num_food >= rules.minimum_food
+        if rules.food_spawns is FoodSpawns.SAMPLED:
+            lucky = self._rng.random(self.batch_size) * 100 < rules.food_spawn_chance
+            spawn[extra & lucky] = 1
+        else:
+            game_turn = rules.start_turn + self.turn
+            chance = rules.food_spawn_chance
+            spawn[extra] = (game_turn + 1) * chance // 100 - game_turn * chance // 100
+        games = np.flatnonzero(spawn)
+        spawn = spawn[games]
+        while games.size:
+            self._placeFood(games)
+            spawn -= 1
+            games = games[spawn > 0]
+            spawn = spawn[spawn > 0]
+
+    def _placeFood(self, games: np.ndarray):
+        """Put a food on a random empty cell in each of the games, if there is
+        one."""
+        # Most cells are empty, so a random cell usually is. Only games that
+        # keep missing pay for looking at every cell.
+        for _ in range(PLACEMENT_TRIES):
+            cells = self._board_cells[
+                self._rng.integers(len(self._board_cells), size=games.size)
+            ]
+            empty = (
+                ~self.food[games, cells]
+                & (self.occupancy[games, cells] == 0)
+                & ~np.any(self.heads[games] == cells[:, np.newaxis], axis=1)
+            )
+            self.food[games[empty], cells[empty]] = True
+            games = games[~empty]
+            if games.size == 0:
+                return
+        empty = self._on_board & ~self.food[games] & (self.occupancy[games] == 0)
+        empty[np.arange(games.size)[:, np.newaxis], self.heads[games]] = False
+        scores = np.where(empty, self._rng.random(empty.shape), -1.0)
+        cells = scores.argmax(axis=1)
+        found = scores[np.arange(games.size), cells] >= 0
+        self.food[games[found], cells[found]] = True
@@ -0,0 +1,149 @@
+import itertools
+from typing import List
+
+import src.models as models
+from src.planning.simulation import Simulation, ParsedBoard, Rules
+
+
+class BitboardSimulation(Simulation):
+    """A Simulation that keeps the board as integer bitboards.
+
+    Cell (x, y) is bit `y * width + x`. Occupancy is a single int per turn,
+    so collision checks are a shift and a mask instead of scanning every body
+    segment. Food and hazards are handled by Simulation. The public interface
+    is the same as Simulation, so search code can use either one.
+
+    Bitboard attributes (one entry per turn, like the other _t_ tables):
+    _t_occupied: cells covered by any body segment other than a head
+    _t_heads: cell index of each snake's head, or -1 if out of bounds
+    """
+
+    def __init__(
+        self,
+        board: models.Board | ParsedBoard,
+        max_depth=100,
+        rules: Rules = Rules(),
+    ):
+        super().__init__(board, max_depth=max_depth, rules=rules)
+
+        # Occupancy is kept in the bitboards instead of Simulation's counts.
+        self._occupancy = None
+        self._head_counts = None
+
+        occupied = 0
+        for body in self.bodies:
+            for segment in itertools.islice(body.current_body, 1, None):
+                occupied |= 1 << self._cell(segment)
+        self._t_occupied = [occupied]
+        self._t_heads = [[self._cell(body.head()) for body in self.bodies]]
+
+    def _cell(self, coord: models.Coord) -> int:
+        """Bit index of a coordinate, or -1 if it is off the board."""
+        if not (0 <= coord.x < self.width and 0 <= coord.y < self.height):
+            return -1
+        return coord.y * self.width + coord.x
+
+    def is_obvious_death(self, snk_id: int, d: models.Direction):
+        body = self.bodies[snk_id]
+        x = body.head().x + d.rel_x
+        y = body.head().y + d.rel_y
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            # Out of bounds
+            return True
+        neck = body.current_body[1]
+        if neck.x == x and neck.y == y:
+            # Back on the neck
+            return True
+        coord = self._cells.at(x, y)
+        if self._liveHeadAt(coord):
+            # That head's neck will be here next turn
+            return True
+        if not self._t_occupied[self.turn] >> (y * self.width + x) & 1:
+            return False
+        # Into a body, which is fine only if it's a tail that's moving away.
+        return self._vacatingTails(coord) == 0
+
+    def _growTables(self, turns: int):
+        extra = turns - self._table_turns
+        self._t_occupied.extend([0] * extra)
+        self._t_heads.extend([None] * extra)
+        super()._growTables(turns)
+
+    def _moveSnakes(self):
+        width = self.width
+        height = self.height
+        cells = self._cells
+        occupied = self._t_occupied[self.turn]
+        heads = list(self._t_heads[self.turn])
+        move_choices = self._move_choices
+        first = self.turn * self._num_snakes
+        health = self._health
+        for snk_id in self.snake_ids:
+            # Skip dead snakes
+            if health[first + snk_id] <= 0:
+                continue
+
+            # Raise error if no move was submitted
+            move = move_choices[first + snk_id]
+            if move < 0:
+                raise ValueError(f"Snake {snk_id} did not submit a move.")
+            d = models.CARDINAL_FOUR[move]
+
+            body = self.bodies[snk_id]
+            old_head = body.head()
+            x = old_head.x + d.rel_x
+            y = old_head.y + d.rel_y
+            body.add_head(cells.at(x, y))
+            body.del_tail()
+
+            # The old head is now a body segment. Live snakes are always in
+            # bounds, so the old head has a valid cell.
+            occupied |= 1 << heads[snk_id]
+            if 0 <= x < width and 0 <= y < height:
+                heads[snk_id] = y * width + x
+            else:
+                heads[snk_id] = -1
+            # The old tail's cell is only freed if it wasn't stacked.
+            old_tail = body.old_tails[-1]
+            new_tail = body.tail()
+            if old_tail.x != new_tail.x or old_tail.y != new_tail.y:
+                occupied &= ~(1 << (old_tail.y * width + old_tail.x))
+
+        self._t_occupied[self.turn + 1] = occupied
+        self._t_heads[self.turn + 1] = heads
+
+    def _undo_moveSnakes(self):
+        # The bitboards are per turn, so only the bodies need undoing.
+        for snk_id in self.snake_ids:
+            if self.snake_is_dead(snk_id):
+                continue
+            body = self.bodies[snk_id]
+            body.undo_add_head()
+            body.undo_del_tail()
+
+    def _growSnake(self, snk_id: int):
+        # The new tail is stacked on a cell that is already occupied.
+        self.bodies[snk_id].grow()
+
+    def _undo_growSnake(self, snk_id: int):
+        self.bodies[snk_id].undo_grow()
+
+    def _snakeIsOutOfBounds(self, snk_id: int):
+        return self._t_heads[self.turn + 1][snk_id] < 0
+
+    def _snakeHasBodyCollided(self, snk_id: int):
+        head = self._t_heads[self.turn + 1][snk_id]
+        return head >= 0 and (self._t_occupied[self.turn + 1] >> head) & 1 == 1
+
+    def _snakeHasLostHeadToHead(self, snk_id: int):
+        heads: List[int] = self._t_heads[self.turn + 1]
+        # Almost every turn, nobody shares a head cell.
+        if heads.count(heads[snk_id]) == 1:
+            return False
+        this_length = len(self.bodies[snk_id])
+        for other_id, head in enumerate(heads):
+            if other_id == snk_id or head != heads[snk_id]:
+                continue
+            if len(self.bodies[other_id]) >= this_length:
+                return True
+        return False
@@ -0,0 +1,70 @@
+import functools
+from typing import List
+
+import src.models as models
+
+
+class CellTable:
+    """One shared Coord for every cell of a board size.
+
+    Search code looks Coords up here instead of making new ones, so moving a
+    snake allocates nothing, and Coords from the same table can be compared
+    with `is`.
+
+    Cells are indexed on a board padded by one cell on every side, the same
+    as ZobristKeys, so a head that just moved out of bounds still has a Coord.
+    Nothing can move further out than that, because it's dead.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.stride = width + 2
+        self.coords = [
+            models.Coord.from_x_y(x, y)
+            for y in range(-1, height + 1)
+            for x in range(-1, width + 1)
+        ]
+        self.on_board = [0 <= c.x < width and 0 <= c.y < height for c in self.coords]
+        # Index offset of a step in each direction, in CARDINAL_FOUR order.
+        self.offsets = [d.rel_y * self.stride + d.rel_x for d in models.CARDINAL_FOUR]
+        # The cells next to each cell that are on the board, in CARDINAL_FOUR
+        # order. Empty for cells that aren't on the board.
+        self.neighbors: List[List[models.Coord]] = [
+            (
+                [
+                    self.coords[i + offset]
+                    for offset in self.offsets
+                    if self.on_board[i + offset]
+                ]
+                if self.on_board[i]
+                else []
+            )
+            for i in range(len(self.coords))
+        ]
+
+    def __deepcopy__(self, memo) -> "CellTable":
+        # The table never changes, so copies of a Simulation can share it.
+        return self
+
+    def index(self, coord: models.Coord) -> int:
+        return (coord.y + 1) * self.stride + coord.x + 1
+
+    def at(self, x: int, y: int) -> models.Coord:
+        return self.coords[(y + 1) * self.stride + x + 1]
+
+    def intern(self, coord: models.Coord) -> models.Coord:
+        """The table's Coord for the same cell."""
+        return self.coords[(coord.y + 1) * self.stride + coord.x + 1]
+
+    def step(self, coord: models.Coord, d: models.Direction) -> models.Coord:
+        """The Coord one move in direction d from coord."""
+        return self.coords[
+            (coord.y + 1 + d.rel_y) * self.stride + coord.x + 1 + d.rel_x
+        ]
+
+
+@functools.lru_cache(maxsize=16)
+def cells_for(width: int, height: int) -> CellTable:
+    """Every Simulation of the same size shares a table."""
+    return CellTable(width, height)
@@ -0,0 +1,57 @@
+import time
+from typing import Callable, Iterable, Iterator, Self, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """A point in time that search code checks cooperatively.
+
+    Based on the monotonic clock, so it's unaffected by wall clock changes and
+    can be checked from any thread.
+    """
+
+    def __init__(self, limit_ms: float):
+        self.end = time.monotonic() + limit_ms / 1000
+
+    @classmethod
+    def at(cls, end: float) -> Self:
+        """Deadline at an absolute time.monotonic() value."""
+        deadline = cls(0)
+        deadline.end = end
+        return deadline
+
+    def remaining_ms(self) -> float:
+        return (self.end - time.monotonic()) * 1000
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.end
+
+    def check(self):
+        """Raise TimeoutError if the deadline has passed."""
+        if time.monotonic() >= self.end:
+            raise TimeoutError("Ok, we're out of time. Wrap it up.")
+
+
+def deepen(
+    deadline: Deadline | None, depths: Iterable[int], search: Callable[[int], T]
+) -> Iterator[Tuple[int, T]]:
+    """Run search at each depth in turn, and yield the depths that finish.
+
+    Stops when search raises TimeoutError. Each depth takes longer than the
+    last, so it also stops rather than start a depth that won't finish before
+    the deadline. Without a deadline every depth is searched.
+    """
+    last_duration_ms = 0
+    for depth in depths:
+        if deadline is not None:
+            if deadline.remaining_ms() < last_duration_ms:
+                return
+            start_ms = deadline.remaining_ms()
+        try:
+            result = search(depth)
+        except TimeoutError:
+            return
+        if deadline is not None:
+            last_duration_ms = start_ms - deadline.remaining_ms()
+        yield depth, result
@@ -1,11 +1,13 @@
 from typing import Iterable, Tuple, List, Mapping
-import signal
+import collections
+import itertools
 import time
 import copy
 
 import src.models as models
 import config
 
+from src.planning.deadline import Deadline
 from src.planning.simulation import Simulation
 
 # from one board state with 4 snakes, there are 4 * 4 * 4 * 4 possible new board states
@@ -43,38 +45,79 @@ class ChildGenerator:
 class TimedBFS:
     CLEANUP_TIME_MS = 2
 
-    def __init__(self, root_node: ChildGenerator, limit_ms: int):
+    def __init__(
+        self,
+        root_node: ChildGenerator,
+        limit_ms: int,
+        max_frontier: int | None = None,
+    ):
+        """
+        Args:
+            root_node (ChildGenerator): Where the search starts.
+            limit_ms (int): How long run() may take.
+            max_frontier (int | None): Most nodes to keep waiting for
+                expansion. Once the frontier is full, new children are dropped
+                (and counted in num_dropped) until expansions make room.
+        """
         self.limit_ms = limit_ms
-        assert (
-            self.limit_ms > self.CLEANUP_TIME_MS,
-            f"Limit must be greater than {self.CLEANUP_TIME_MS}ms.",
-        )
+        self.max_frontier = max_frontier
+        if self.limit_ms <= self.CLEANUP_TIME_MS:
+            raise ValueError(f"Limit must be greater than {self.CLEANUP_TIME_MS}ms.")
 
-        self.q = list()
+        self.q = collections.deque()
         self.q.append(root_node)
         self.num_expanded = 0
+        self.num_dropped = 0
+        self.peak_frontier_size = 1
+        self.elapsed_ms = 0.0
 
     def run(self):
-        def handler(signum, frame):
-            raise TimeoutError("Ok, we're out of time. Wrap it up.")
+        """Expand nodes until the frontier is empty or time runs out.
 
-        # Set the signal handler and an alarm
-        signal.signal(signal.SIGALRM, handler)
+        The time limit is checked between nodes and between children, so this
+        works from any thread or process. It overshoots by at most the time it
+        takes to generate one child.
+        """
         # Leave time to cleanup at the end
-        signal.setitimer(
-            signal.ITIMER_REAL, 0.001 * (self.limit_ms - self.CLEANUP_TIME_MS)
-        )
-
+        deadline = Deadline(self.limit_ms - self.CLEANUP_TIME_MS)
+        start = time.monotonic()
         try:
-            while len(self.q) > 0:
-                node = self.q.pop(0)
+            while len(self.q) > 0 and not deadline.expired():
+                node = self.q.popleft()
                 for child in node.children():
+                    if deadline.expired():
+                        return
+                    if (
+                        self.max_frontier is not None
+                        and len(self.q) >= self.max_frontier
+                    ):
+                        self.num_dropped += 1
+                        continue
                     self.q.append(child)
                 self.num_expanded += 1
-        except TimeoutError:
-            return
+                self.peak_frontier_size = max(self.peak_frontier_size, len(self.q))
         finally:
-            signal.setitimer(signal.ITIMER_REAL, 0)
+            # Running out of time part way through a node skips the update
+            # above.
+            self.peak_frontier_size = max(self.peak_frontier_size, len(self.q))
+            self.elapsed_ms = (time.monotonic() - start) * 1000
+
+    @property
+    def frontier_size(self) -> int:
+        return len(self.q)
+
+    def stats(self) -> Mapping[str, float]:
+        """Counters from the last run, to compare search throughput."""
+        return {
+            "num_expanded": self.num_expanded,
+            "num_dropped": self.num_dropped,
+            "frontier_size": self.frontier_size,
+            "peak_frontier_size": self.peak_frontier_size,
+            "elapsed_ms": self.elapsed_ms,
+            "expanded_per_second": (
+                1000 * self.num_expanded / self.elapsed_ms if self.elapsed_ms else 0
+            ),
+        }
 
 
 def snake_decision_or_board_state(sim: Simulation, snk_id: int):
@@ -85,8 +128,8 @@ def snake_decision_or_board_state(sim: Simulation, snk_id: int):
         except AssertionError:
             print(sim.turn)
             print(sim.snake_is_dead(1))
-            print(sim._t_move_choices[0 : sim.turn + 1])
-            print(sim._t_health[0 : sim.turn + 1])
+            print(sim._move_choices[0 : (sim.turn + 1) * len(sim.snake_ids)])
+            print(sim._health[0 : (sim.turn + 1) * len(sim.snake_ids)])
             raise
 
         return BoardState(sim)
@@ -155,3 +198,84 @@ class BoardState(ChildGenerator):
             self.root = SnakeDecision(self.sim, 0)
         for n in self.root.children():
             yield n
+
+
+# Byte used in a packed move history for a snake that is dead and can't move.
+NO_MOVE = 255
+
+
+class SharedSimulation:
+    """One Simulation shared by every node of a search.
+
+    Nodes only remember the moves that lead to them, packed as bytes: for each
+    turn, one byte per snake holding the index of its direction in
+    models.CARDINAL_FOUR, or NO_MOVE if it is dead.
+
+    To move the sim to a node, turns are undone back to the deepest ancestor
+    the current position and the node have in common, then the rest of the
+    node's moves are replayed. Breadth first search visits siblings one after
+    another, so usually only a turn or two has to be undone and replayed.
+    """
+
+    def __init__(self, sim: Simulation):
+        self.sim = sim
+        self.num_snakes = len(sim.snake_ids)
+        # The moves that have been applied to sim
+        self._moves = b""
+
+    def goto(self, moves: bytes) -> Simulation:
+        n = self.num_snakes
+        common = 0
+        limit = min(len(moves), len(self._moves))
+        while (
+            common < limit
+            and self._moves[common : common + n] == moves[common : common + n]
+        ):
+            common += n
+
+        while len(self._moves) > common:
+            self.sim.undo_turn()
+            self._moves = self._moves[:-n]
+
+        for start in range(common, len(moves), n):
+            for snk_id, move in enumerate(moves[start : start + n]):
+                if move != NO_MOVE:
+                    self.sim.do_move(snk_id, models.CARDINAL_FOUR[move])
+            self.sim.do_turn()
+        self._moves = moves
+        return self.sim
+
+
+class DeltaBoardState(ChildGenerator):
+    """A board state stored as the packed moves that lead to it.
+
+    This is an alternative to BoardState that doesn't copy the Simulation for
+    every node. All nodes of a search share one SharedSimulation, and a node
+    only holds a short bytes object, so frontier nodes are small and don't
+    keep their ancestors alive. The state is rebuilt from the moves when the
+    node is expanded. Because of that, a node's children must be consumed
+    before another node is expanded.
+    """
+
+    __slots__ = ("shared", "moves")
+
+    def __init__(self, shared: SharedSimulation, moves: bytes = b""):
+        self.shared = shared
+        self.moves = moves
+
+    @classmethod
+    def root(cls, sim: Simulation) -> "DeltaBoardState":
+        return cls(SharedSimulation(sim))
+
+    def children(self) -> Iterable[ChildGenerator]:
+        sim = self.shared.goto(self.moves)
+        if sim.turn == sim.max_depth:
+            return
+
+        all_moves = range(len(models.CARDINAL_FOUR))
+        options = [
+            (NO_MOVE,) if sim.snake_is_dead(snk_id) else all_moves
+            for snk_id in sim.snake_ids
+        ]
+        for joint_move in itertools.product(*options):
+            yield DeltaBoardState(self.shared, self.moves + bytes(joint_move))
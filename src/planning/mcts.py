@@ -0,0 +1,216 @@
+import math
+import random
+from typing import Dict, List, NamedTuple, Tuple
+
+from src import models
+from src.planning.deadline import Deadline
+from src.planning.simulation import FoodSpawns, ParsedBoard, Rules, Simulation
+
+# UCB1 exploration constant. Rewards are in [0, 1], so sqrt(2) is the usual.
+EXPLORATION = math.sqrt(2)
+# How many random turns are played out below a new node.
+ROLLOUT_DEPTH = 10
+# Nothing is expanded deeper than this many turns below the root.
+MAX_TREE_DEPTH = 30
+
+# Index into CARDINAL_FOUR of each snake's move, None for snakes that are dead.
+JointMove = Tuple[int | None, ...]
+
+
+def safe_options(sim: Simulation, snk_id: int) -> List[int]:
+    """Moves a snake could make that aren't obvious deaths, or all four if
+    they all are. Empty if the snake is dead."""
+    if sim.snake_is_dead(snk_id):
+        return []
+    options = [
+        i
+        for i, d in enumerate(models.CARDINAL_FOUR)
+        if not sim.is_obvious_death(snk_id, d)
+    ]
+    return options or list(range(len(models.CARDINAL_FOUR)))
+
+
+class Node:
+    """A position in the tree, with separate move statistics for each snake.
+
+    Snakes move simultaneously, so each one picks its own move with UCB1 over
+    its own statistics, as if the others weren't there (decoupled UCT). The
+    picks together make the joint move that leads to a child.
+    """
+
+    def __init__(self, sim: Simulation):
+        self.visits = 0
+        self.options = [safe_options(sim, snk_id) for snk_id in sim.snake_ids]
+        num_moves = len(models.CARDINAL_FOUR)
+        self.move_visits = [[0] * num_moves for _ in sim.snake_ids]
+        self.move_values = [[0.0] * num_moves for _ in sim.snake_ids]
+        self.children: Dict[JointMove, Node] = {}
+
+    def is_terminal(self) -> bool:
+        # Searching on is pointless once we're dead or the last one standing.
+        alive = sum(1 for options in self.options if options)
+        return not self.options[0] or alive < 2
+
+    def select(self, rng: random.Random, exploration: float) -> JointMove:
+        return tuple(
+            self._select_for(snk_id, rng, exploration) if options else None
+            for snk_id, options in enumerate(self.options)
+        )
+
+    def _select_for(self, snk_id: int, rng: random.Random, exploration: float) -> int:
+        visits = self.move_visits[snk_id]
+        values = self.move_values[snk_id]
+        untried = [move for move in self.options[snk_id] if visits[move] == 0]
+        if untried:
+            return rng.choice(untried)
+        log_visits = math.log(self.visits)
+        return max(
+            self.options[snk_id],
+            key=lambda move: values[move] / visits[move]
+            + exploration * math.sqrt(log_visits / visits[move]),
+        )
+
+    def update(self, joint_move: JointMove, rewards: List[float]):
+        self.visits += 1
+        for snk_id, move in enumerate(joint_move):
+            if move is None:
+                continue
+            self.move_visits[snk_id][move] += 1
+            self.move_values[snk_id][move] += rewards[snk_id]
+
+
+class DirectionReport(NamedTuple):
+    direction: models.Direction
+    visits: int
+    # Mean reward, between 0 and 1
+    value: float
+
+
+def _do_joint_move(sim: Simulation, joint_move: JointMove):
+    for snk_id, move in enumerate(joint_move):
+        if move is not None:
+            sim.do_move(snk_id, models.CARDINAL_FOUR[move])
+    sim.do_turn()
+
+
+def _rollout(sim: Simulation, depth: int, rng: random.Random) -> int:
+    """Play random safe moves for up to depth turns. Returns the number of
+    turns played, which the caller has to undo."""
+    for played in range(depth):
+        joint_move = tuple(
+            rng.choice(options) if options else None
+            for options in (safe_options(sim, snk_id) for snk_id in sim.snake_ids)
+        )
+        if joint_move[0] is None or sum(m is not None for m in joint_move) < 2:
+            return played
+        _do_joint_move(sim, joint_move)
+    return depth
+
+
+def _rewards(sim: Simulation) -> List[float]:
+    """The share of the turns since the root (turn 0) each snake survived."""
+    if sim.turn == 0:
+        return [0.0 if sim.snake_is_dead(i) else 1.0 for i in sim.snake_ids]
+    return [sim.turns_alive(snk_id) / sim.turn for snk_id in sim.snake_ids]
+
+
+class Tree:
+    """A decoupled UCT search tree for the first snake on the board.
+
+    The tree is kept between calls to search(), so more time can be spent on
+    the same position.
+
+    New food is sampled, whatever rules.food_spawns says, with a seed drawn
+    from the tree's own random numbers. The same position always gets the
+    same food, so the tree stays consistent with the sim.
+    """
+
+    def __init__(
+        self,
+        board: models.Board | ParsedBoard,
+        exploration: float = EXPLORATION,
+        rollout_depth: int = ROLLOUT_DEPTH,
+        max_tree_depth: int = MAX_TREE_DEPTH,
+        seed: int | None = None,
+        rules: Rules = Rules(),
+    ):
+        self.rng = random.Random(seed)
+        rules = rules._replace(
+            food_spawns=FoodSpawns.SAMPLED, seed=self.rng.getrandbits(64)
+        )
+        self.sim = Simulation(
+            board, max_depth=max_tree_depth + rollout_depth, rules=rules
+        )
+        self.root = Node(self.sim)
+        self.exploration = exploration
+        self.rollout_depth = rollout_depth
+        self.max_tree_depth = max_tree_depth
+
+    def iterate(self):
+        """Select down to a new node, play out from it, and back up the result."""
+        sim = self.sim
+        node = self.root
+        path: List[Tuple[Node, JointMove]] = []
+        while not node.is_terminal() and sim.turn < self.max_tree_depth:
+            joint_move = node.select(self.rng, self.exploration)
+            path.append((node, joint_move))
+            _do_joint_move(sim, joint_move)
+            child = node.children.get(joint_move)
+            if child is None:
+                node.children[joint_move] = Node(sim)
+                break
+            node = child
+
+        played = _rollout(sim, self.rollout_depth, self.rng)
+        rewards = _rewards(sim)
+        for _ in range(played + len(path)):
+            sim.undo_turn()
+
+        for node, joint_move in path:
+            node.update(joint_move, rewards)
+
+    def search(self, deadline: Deadline, max_iterations: int | None = None):
+        """Iterate until the deadline, or until max_iterations if given."""
+        iterations = 0
+        while not deadline.expired():
+            if max_iterations is not None and iterations >= max_iterations:
+                break
+            self.iterate()
+            iterations += 1
+
+    def report(self) -> List[DirectionReport]:
+        """Visits and mean reward of each of the first snake's root moves."""
+        visits = self.root.move_visits[0]
+        values = self.root.move_values[0]
+        return [
+            DirectionReport(
+                models.CARDINAL_FOUR[move],
+                visits[move],
+                values[move] / visits[move] if visits[move] else 0.0,
+            )
+            for move in self.root.options[0]
+        ]
+
+    def best_direction(self) -> models.Direction:
+        """The first snake's most visited root move."""
+        if not self.root.options[0]:
+            # Already dead, any move will do.
+            return models.UP
+        return max(self.report(), key=lambda r: (r.visits, r.value)).direction
+
+
+def ideal_direction(
+    board: models.Board | ParsedBoard,
+    deadline: Deadline,
+    seed: int | None = None,
+    rules: Rules = Rules(),
+) -> Tuple[models.Direction, List[DirectionReport]]:
+    """Search with decoupled UCT until the deadline.
+
+    Returns:
+        Tuple[models.Direction, List[DirectionReport]]: The most visited root
+            direction, and the visits and values of every root direction.
+    """
+    tree = Tree(board, seed=seed, rules=rules)
+    tree.search(deadline)
+    return tree.best_direction(), tree.report()
@@ -1,10 +1,17 @@
+from typing import List, Tuple
+
 from src import models
-from src.planning.simulation import Simulation
+from src.planning.deadline import Deadline, deepen
+from src.planning.simulation import Rules, Simulation
+
+# evaluate() can only return values in this range.
+MIN_VALUE = 0b00
+MAX_VALUE = 0b11
 
 
 def evaluate(sim: Simulation) -> int:
     """Returns the minimax value function for this sim state.
-    
+
     Our snake is assumed to be the first snake (simple_id = 0).
 
     Currently, this returns the bit ordering `I'm alive | You're dead`. This
@@ -16,7 +23,149 @@ def evaluate(sim: Simulation) -> int:
     return (IM_ALIVE if sim.healths[0] > 0 else 0) | (YOURE_DEAD if sim.healths[1] == 0 else 0)
 
 
-def ideal_direction(board: models.Board, depth: int) -> models.Direction:
-    sim = Simulation(board, max_depth=depth)
+def candidate_moves(sim: Simulation, snk_id: int) -> List[models.Direction]:
+    """Moves worth searching for a snake.
+
+    Obvious deaths are skipped. If every move is an obvious death the snake
+    still has to pick one, so the first direction is returned on its own.
+    """
+    moves = [d for d in models.CARDINAL_FOUR if not sim.is_obvious_death(snk_id, d)]
+    if len(moves) == 0:
+        return models.CARDINAL_FOUR[:1]
+    return moves
+
+
+def alpha_beta(
+    sim: Simulation,
+    depth: int,
+    alpha: int,
+    beta: int,
+    deadline: Deadline | None = None,
+) -> int:
+    """Minimax value of the sim for snake 0, searching `depth` turns ahead.
+
+    Moves are simultaneous, so each turn is modeled as us choosing first and
+    the opponent replying with knowledge of our move. This is pessimistic, but
+    it means the value we get is guaranteed no matter what the opponent does.
+
+    Values outside of (alpha, beta) are not exact, they only tell the caller
+    that this line won't be chosen.
+
+    If a deadline is given and it passes, TimeoutError is raised and the sim is
+    left partway through the search.
+    """
+    if depth <= 0 or sim.snake_is_dead(0) or sim.snake_is_dead(1):
+        return evaluate(sim)
+    if deadline is not None:
+        deadline.check()
+
+    my_moves = candidate_moves(sim, 0)
+    best_value = MIN_VALUE - 1
+    for my_move in my_moves:
+        value = worst_reply(sim, my_move, depth, alpha, beta, deadline)
+        best_value = max(best_value, value)
+        alpha = max(alpha, best_value)
+        # The opponent won't let the game reach this position.
+        if alpha >= beta:
+            break
+    return best_value
+
+
+def worst_reply(
+    sim: Simulation,
+    my_move: models.Direction,
+    depth: int,
+    alpha: int,
+    beta: int,
+    deadline: Deadline | None = None,
+) -> int:
+    """Value of snake 0 making my_move if the opponent replies with the move
+    that is worst for us."""
+    sim.do_move(0, my_move)
+    their_moves = candidate_moves(sim, 1)
+    worst_value = MAX_VALUE + 1
+    for their_move in their_moves:
+        sim.do_move(1, their_move)
+        sim.do_turn()
+        value = alpha_beta(sim, depth - 1, alpha, min(beta, worst_value), deadline)
+        sim.undo_turn()
+        sim.undo_move(1)
+        worst_value = min(worst_value, value)
+        # The opponent can already hold us to less than we can get elsewhere,
+        # so we won't make this move.
+        if worst_value <= alpha:
+            break
+    sim.undo_move(0)
+    return worst_value
+
+
+def ideal_direction(
+    board: models.Board,
+    depth: int,
+    simulation_type: type[Simulation] = Simulation,
+    rules: Rules = Rules(),
+) -> models.Direction:
+    """Best direction for the first snake on the board in a 1v1 game."""
+    sim = simulation_type(board, max_depth=depth, rules=rules)
     if len(sim.snake_ids) != 2:
-        raise ValueError("Minimax does not support boards with more than two snakes yet.")
\ No newline at end of file
+        raise ValueError("Minimax does not support boards with more than two snakes yet.")
+    return _search_root(sim, depth)[1]
+
+
+def _search_root(
+    sim: Simulation,
+    depth: int,
+    first: models.Direction | None = None,
+    deadline: Deadline | None = None,
+) -> Tuple[int, models.Direction]:
+    """Best value and direction for snake 0. first, if given, is tried first."""
+    moves = candidate_moves(sim, 0)
+    if first in moves:
+        moves.remove(first)
+        moves.insert(0, first)
+    best_value = MIN_VALUE - 1
+    best_direction = None
+    for d in moves:
+        value = worst_reply(sim, d, depth, best_value, MAX_VALUE + 1, deadline)
+        if value > best_value:
+            best_value = value
+            best_direction = d
+        # Nothing can beat this, no need to look further.
+        if best_value >= MAX_VALUE:
+            break
+    return best_value, best_direction
+
+
+def iterative_deepening(
+    board: models.Board,
+    deadline: Deadline,
+    max_depth: int = 20,
+    simulation_type: type[Simulation] = Simulation,
+    rules: Rules = Rules(),
+) -> Tuple[models.Direction, int]:
+    """Search one turn deeper at a time until the deadline, in a 1v1 game.
+
+    Each search tries the last one's best move first.
+
+    Returns:
+        Tuple[models.Direction, int]: The best direction from the deepest
+            search that finished, and that depth. If not even a one turn search
+            finishes, the first candidate move is returned with depth 0.
+    """
+    sim = simulation_type(board, max_depth=max_depth, rules=rules)
+    if len(sim.snake_ids) != 2:
+        raise ValueError("Minimax does not support boards with more than two snakes yet.")
+
+    best_direction = candidate_moves(sim, 0)[0]
+    completed_depth = 0
+
+    def search(depth: int) -> Tuple[int, models.Direction]:
+        return _search_root(sim, depth, best_direction, deadline)
+
+    for completed_depth, (best_value, best_direction) in deepen(
+        deadline, range(1, max_depth + 1), search
+    ):
+        # A win that holds at this depth holds at every deeper one too.
+        if best_value >= MAX_VALUE:
+            break
+    return best_direction, completed_depth
@@ -1,7 +1,10 @@
-from typing import Self
+from typing import List, Self, Sequence, Tuple
 
 from src import models
-from src.planning.simulation import Simulation
+from src.planning.deadline import Deadline, deepen
+from src.planning.simulation import Rules, Simulation
+from src.planning.territory import counter_for
+from src.planning.transposition import TranspositionTable
 import config
 
 
@@ -13,6 +16,28 @@ def pack_to_bits(*args, bits=8) -> int:
     return res
 
 
+# Each snake's evaluate_for value, indexed by snake id.
+Scores = List[int]
+
+
+def evaluate(sim: Simulation) -> Scores:
+    """Every snake's Result.evaluate_for value, without building a Result.
+
+    Reads the simulation's running counters, so nothing is scanned.
+    """
+    # Health and the number of dead snakes always fit in their 8 bits.
+    num_dead = sim.num_dead << 16
+    alive_turns = min(sim.turn, 255) << 24
+    bodies = sim.bodies
+    return [
+        (alive_turns if health > 0 else min(sim.turns_alive(snk_id), 255) << 24)
+        | num_dead
+        | min(len(bodies[snk_id]), 255) << 8
+        | health
+        for snk_id, health in enumerate(sim.healths)
+    ]
+
+
 class Result:
     def __init__(self, sim: Simulation):
         self.healths = list(sim.healths)
@@ -27,6 +52,28 @@ class Result:
         if config.DEBUG:
             self.sim_render = sim.render()
 
+    @classmethod
+    def from_scores(cls, scores: Sequence[int]) -> Self:
+        """Rebuild the Result that evaluate() scored.
+
+        Each field is capped at 255 in the scores, so a snake longer than that
+        comes back as 255 long.
+        """
+        result = cls.__new__(cls)
+        result.healths = [score & 0xFF for score in scores]
+        result.num_dead = scores[0] >> 16 & 0xFF if scores else 0
+        result.lengths = [score >> 8 & 0xFF for score in scores]
+        result.turns_alive = {
+            snk_id: score >> 24 for snk_id, score in enumerate(scores)
+        }
+        result.sim_render = None
+        return result
+
+    @classmethod
+    def score(cls, sim: Simulation) -> Scores:
+        """Every snake's evaluate_for value, straight from the sim."""
+        return evaluate(sim)
+
     def evaluate_for(self, snk_id: str) -> int:
         # | 8 bits      | 8 bits        | 8 bits    | 8 bits    |
         # | turns alive | # dead snakes | my_length | my health |
@@ -54,88 +101,274 @@ class Result:
         )
 
 
+def evaluate_territory(sim: Simulation) -> Scores:
+    """Every snake's TerritoryResult.evaluate_for value.
+
+    The same as evaluate(), with each snake's Voronoi territory slotted in
+    between the number of dead snakes and its length.
+    """
+    territory = counter_for(sim.width, sim.height).voronoi(sim)
+    return [
+        (score >> 16) << 24 | min(cells, 255) << 16 | score & 0xFFFF
+        for score, cells in zip(evaluate(sim), territory)
+    ]
+
+
+class TerritoryResult(Result):
+    """A Result that also counts the cells each snake can get to first.
+
+    A snake that has walled itself in scores badly here turns before it dies,
+    so a shallow search can see the trap coming.
+    """
+
+    def __init__(self, sim: Simulation):
+        super().__init__(sim)
+        self.territory = list(counter_for(sim.width, sim.height).voronoi(sim))
+
+    @classmethod
+    def from_scores(cls, scores: Sequence[int]) -> Self:
+        # Drop the territory byte and the rest unpacks like a Result.
+        result = super().from_scores(
+            [(score >> 24) << 16 | score & 0xFFFF for score in scores]
+        )
+        result.territory = [score >> 16 & 0xFF for score in scores]
+        return result
+
+    @classmethod
+    def score(cls, sim: Simulation) -> Scores:
+        return evaluate_territory(sim)
+
+    def evaluate_for(self, snk_id: str) -> int:
+        # | 8 bits      | 8 bits        | 8 bits       | 8 bits    | 8 bits    |
+        # | turns alive | # dead snakes | my territory | my_length | my health |
+        return pack_to_bits(
+            self.turns_alive[snk_id],
+            self.num_dead,
+            self.territory[snk_id],
+            self.lengths[snk_id],
+            self.healths[snk_id],
+        )
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, TerritoryResult)
+            and super().__eq__(other)
+            and self.territory == other.territory
+        )
+
+
 class DecisionNode:
+    # Set by subclasses, every node knows the scores it leads to.
+    _scores: Scores
+
     def get_result(self) -> Result:
         raise NotImplementedError
 
+    def get_scores(self) -> Scores:
+        return self._scores
+
     def node_evaluate_for(self, snk_id: int) -> int:
-        return self.get_result().evaluate_for(snk_id)
+        return self._scores[snk_id]
 
 
 class LeafNode(DecisionNode):
     ResultType = Result
 
     def __init__(self, sim: Simulation):
-        self._result = self.ResultType(sim)
+        # Leaves are the most common node by far, so normally they only keep
+        # their scores. The Result is rebuilt from them if anyone asks. In
+        # DEBUG, the Result is needed for the render, so it's kept too.
+        if config.DEBUG:
+            self._result = self.ResultType(sim)
+            self._scores = [
+                self._result.evaluate_for(snk_id) for snk_id in sim.snake_ids
+            ]
+        else:
+            self._result = None
+            self._scores = self.ResultType.score(sim)
 
     def get_result(self) -> Result:
+        if self._result is None:
+            return self.ResultType.from_scores(self._scores)
         return self._result
 
 
 class SnakeDecision(DecisionNode):
     LeafNodeType = LeafNode
 
-    def __init__(self, *, best_result, best_direction):
+    def __init__(self, *, best_child: DecisionNode, best_direction):
         self._best_direction = best_direction
-        self._best_result = best_result
+        self._best_child = best_child
+        self._scores = best_child.get_scores()
 
     def get_result(self) -> Result:
-        return self._best_result
+        """The Result at the end of the best line, built when asked for."""
+        return self._best_child.get_result()
 
     def get_best_direction(self) -> models.Direction:
         return self._best_direction
 
     @classmethod
-    def _process_turn(cls, sim: Simulation, depth: int) -> DecisionNode:
+    def _process_turn(
+        cls,
+        sim: Simulation,
+        depth: int,
+        deadline: Deadline | None,
+        table: TranspositionTable | None,
+    ) -> DecisionNode:
+        if deadline is not None:
+            deadline.check()
         sim.do_turn()
         if depth <= 0:
             node = cls.LeafNodeType(sim)
+        elif table is None:
+            node = cls._process_snk_id_at_depth(sim, 0, depth, deadline, table)
         else:
-            node = cls._process_snk_id_at_depth(sim, 0, depth)
+            # Different move orders often lead to the same position.
+            node = table.get(sim.zobrist_hash, sim.turn, depth)
+            if node is None:
+                node = cls._process_snk_id_at_depth(sim, 0, depth, deadline, table)
+                table.put(sim.zobrist_hash, sim.turn, depth, node)
         sim.undo_turn()
         return node
 
     @classmethod
     def _process_snk_id_at_depth(
-        cls, sim: Simulation, snk_id: int, depth: int
+        cls,
+        sim: Simulation,
+        snk_id: int,
+        depth: int,
+        deadline: Deadline | None,
+        table: TranspositionTable | None,
     ) -> DecisionNode:
         # Base condition, if we did all the snakes then do a turn.
         if snk_id >= len(sim.snake_ids):
-            return cls._process_turn(sim, depth - 1)
+            return cls._process_turn(sim, depth - 1, deadline, table)
 
         # If this snake is dead, just let the other snakes play.
         if sim.snake_is_dead(snk_id):
-            return cls._process_snk_id_at_depth(sim, snk_id + 1, depth)
+            return cls._process_snk_id_at_depth(
+                sim, snk_id + 1, depth, deadline, table
+            )
 
         # Try moving each direction.
         best_value = None
         best_direction = None
-        best_result = None
-        for d in models.CARDINAL_FOUR:
+        best_child = None
+        for d, obvious_death in move_options(sim, snk_id):
             # If this direction is an obvious death for the current snake, it
             # won't need to consider the future.
-            if sim.is_obvious_death(snk_id, d):
+            if obvious_death:
                 child = cls.LeafNodeType(sim)
             else:
                 sim.do_move(snk_id, d)
-                child = cls._process_snk_id_at_depth(sim, snk_id + 1, depth)
+                child = cls._process_snk_id_at_depth(
+                    sim, snk_id + 1, depth, deadline, table
+                )
                 sim.undo_move(snk_id)
 
             value = child.node_evaluate_for(snk_id)
             if best_value is None or value > best_value:
                 best_direction = d
                 best_value = value
-                best_result = child.get_result()
+                best_child = child
 
-        return cls(best_result=best_result, best_direction=best_direction)
+        return cls(best_child=best_child, best_direction=best_direction)
 
     @classmethod
-    def make_tree(cls, sim: Simulation, depth: int) -> Self:
-        return cls._process_snk_id_at_depth(sim, 0, depth)
+    def make_tree(
+        cls,
+        sim: Simulation,
+        depth: int,
+        deadline: Deadline | None = None,
+        table: TranspositionTable | None = None,
+    ) -> Self:
+        """Search depth turns ahead.
+
+        If a deadline is given and it passes, TimeoutError is raised and the
+        sim is left part way through the search.
+
+        If a table is given, positions already in it aren't searched again,
+        and new positions are added to it.
+        """
+        return cls._process_snk_id_at_depth(sim, 0, depth, deadline, table)
+
+
+class TerritoryLeafNode(LeafNode):
+    ResultType = TerritoryResult
+
 
+class TerritorySnakeDecision(SnakeDecision):
+    """SnakeDecision that scores its leaves with TerritoryResult."""
 
-def ideal_direction(board: models.Board, depth=3) -> models.Direction:
+    LeafNodeType = TerritoryLeafNode
+
+
+def move_options(sim: Simulation, snk_id: int) -> List[Tuple[models.Direction, bool]]:
+    """Each direction SnakeDecision tries for a snake, and whether it is an
+    obvious death.
+
+    If every direction is an obvious death, the snake still has to move so that
+    it actually dies. Only the first direction is tried then, and it is played
+    out like any other move, the same as minimax.candidate_moves.
+    """
+    options = [(d, sim.is_obvious_death(snk_id, d)) for d in models.CARDINAL_FOUR]
+    if all(obvious_death for _, obvious_death in options):
+        return [(models.CARDINAL_FOUR[0], False)]
+    return options
+
+
+def first_safe_direction(sim: Simulation) -> models.Direction:
+    """The first direction that isn't an obvious death for the first snake.
+
+    This is what to fall back to when there is no time to search.
+    """
+    return next(
+        (d for d in models.CARDINAL_FOUR if not sim.is_obvious_death(0, d)),
+        models.CARDINAL_FOUR[0],
+    )
+
+
+def ideal_direction(
+    board: models.Board,
+    depth=3,
+    simulation_type: type[Simulation] = Simulation,
+    decision_type: type[SnakeDecision] = SnakeDecision,
+    rules: Rules = Rules(),
+) -> models.Direction:
     # TODO: require snk_id
-    sim = Simulation(board, max_depth=depth)
-    root = SnakeDecision.make_tree(sim, depth)
+    sim = simulation_type(board, max_depth=depth, rules=rules)
+    root = decision_type.make_tree(sim, depth, table=TranspositionTable())
     return root.get_best_direction()
+
+
+def iterative_deepening(
+    board: models.Board,
+    deadline: Deadline,
+    max_depth: int = 20,
+    simulation_type: type[Simulation] = Simulation,
+    decision_type: type[SnakeDecision] = SnakeDecision,
+    rules: Rules = Rules(),
+) -> Tuple[models.Direction, int]:
+    """Search one turn deeper at a time until the deadline.
+
+    decision_type picks how leaves are scored, TerritorySnakeDecision costs
+    more per leaf but sees traps coming.
+
+    Returns:
+        Tuple[models.Direction, int]: The best direction from the deepest
+            search that finished, and that depth. If not even a one turn search
+            finishes, the first direction that isn't an obvious death is
+            returned with depth 0.
+    """
+    sim = simulation_type(board, max_depth=max_depth, rules=rules)
+    best_direction = first_safe_direction(sim)
+    completed_depth = 0
+    table = TranspositionTable()
+
+    def search(depth: int) -> SnakeDecision:
+        return decision_type.make_tree(sim, depth, deadline=deadline, table=table)
+
+    for completed_depth, root in deepen(deadline, range(1, max_depth + 1), search):
+        best_direction = root.get_best_direction()
+    return best_direction, completed_depth
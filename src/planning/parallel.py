@@ -0,0 +1,197 @@
+import multiprocessing
+import os
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+from src import models
+from src.planning import multi_max
+from src.planning.deadline import Deadline, deepen
+from src.planning.simulation import Rules, Simulation
+from src.planning.transposition import TranspositionTable
+
+# Index into CARDINAL_FOUR of each snake's first move, None for snakes that are
+# dead. Directions don't keep their identity when sent to another process, so
+# they can't be used as keys.
+JointMove = Tuple[int | None, ...]
+
+
+def first_joint_moves(sim: Simulation) -> List[JointMove]:
+    """Every first turn multi_max would search below the root.
+
+    Obvious deaths never get searched, so they are left out.
+    """
+    joint_moves = [()]
+    for snk_id in sim.snake_ids:
+        if sim.snake_is_dead(snk_id):
+            options = [None]
+        else:
+            options = [
+                models.CARDINAL_FOUR.index(d)
+                for d, obvious_death in multi_max.move_options(sim, snk_id)
+                if not obvious_death
+            ]
+        joint_moves = [jm + (d,) for jm in joint_moves for d in options]
+    return joint_moves
+
+
+def _search_joint_moves(
+    board: models.Board,
+    simulation_type: type[Simulation],
+    joint_moves: Sequence[JointMove],
+    depths: Sequence[int],
+    deadline_end: float | None,
+    rules: Rules,
+) -> List[Dict[JointMove, multi_max.Result]]:
+    """Runs in a worker. Searches below each joint move, one depth at a time.
+
+    Returns the results of every depth that finished before the deadline.
+    """
+    deadline = None if deadline_end is None else Deadline.at(deadline_end)
+    sim = simulation_type(board, max_depth=max(depths), rules=rules)
+    table = TranspositionTable()
+
+    def search(depth: int) -> Dict[JointMove, multi_max.Result]:
+        results = {}
+        for joint_move in joint_moves:
+            for snk_id, i in enumerate(joint_move):
+                if i is not None:
+                    sim.do_move(snk_id, models.CARDINAL_FOUR[i])
+            node = multi_max.SnakeDecision._process_turn(
+                sim, depth - 1, deadline, table
+            )
+            for snk_id, i in enumerate(joint_move):
+                if i is not None:
+                    sim.undo_move(snk_id)
+            results[joint_move] = node.get_result()
+        return results
+
+    return [results for _, results in deepen(deadline, depths, search)]
+
+
+def _warm_up():
+    """Runs in each worker as it starts, so the first move doesn't pay for
+    imports."""
+    multi_max.SnakeDecision
+
+
+class ParallelSearch:
+    """multi_max search split over a pool of worker processes at the root.
+
+    Each worker gets a share of the first turn's joint moves and searches
+    below them. The results are merged with the same rules multi_max uses, so
+    the answer matches a single process search to the same depth.
+
+    The pool is started when this is constructed, so it should be made once
+    when the server starts, and close() called when it stops.
+    """
+
+    def __init__(self, num_workers: int | None = None):
+        self.num_workers = num_workers or os.cpu_count()
+        # Spawn rather than fork, the server is multi-threaded.
+        context = multiprocessing.get_context("spawn")
+        self._pool = context.Pool(self.num_workers, initializer=_warm_up)
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+
+    def _search(
+        self,
+        board: models.Board,
+        depths: Sequence[int],
+        deadline: Deadline | None,
+        simulation_type: type[Simulation],
+        rules: Rules = Rules(),
+    ) -> Tuple[List[Dict[JointMove, multi_max.Result]], Simulation]:
+        sim = simulation_type(board, max_depth=max(depths), rules=rules)
+        joint_moves = first_joint_moves(sim)
+        batches = [
+            joint_moves[i :: self.num_workers]
+            for i in range(min(self.num_workers, len(joint_moves)))
+        ]
+        deadline_end = None if deadline is None else deadline.end
+        completed = self._pool.starmap(
+            _search_joint_moves,
+            [
+                (board, simulation_type, batch, depths, deadline_end, rules)
+                for batch in batches
+            ],
+        )
+
+        # Only depths every worker finished can be merged.
+        by_depth = []
+        num_depths = min((len(batch_results) for batch_results in completed), default=0)
+        for i in range(num_depths):
+            results = {}
+            for batch_results in completed:
+                results.update(batch_results[i])
+            by_depth.append(results)
+        return by_depth, sim
+
+    def ideal_direction(
+        self,
+        board: models.Board,
+        depth: int = 3,
+        simulation_type: type[Simulation] = Simulation,
+        rules: Rules = Rules(),
+    ) -> models.Direction:
+        results, sim = self._search(board, [depth], None, simulation_type, rules)
+        if len(results) == 0:
+            return multi_max.first_safe_direction(sim)
+        return merge(sim, results[0])[1]
+
+    def iterative_deepening(
+        self,
+        board: models.Board,
+        deadline: Deadline,
+        max_depth: int = 20,
+        simulation_type: type[Simulation] = Simulation,
+        rules: Rules = Rules(),
+    ) -> Tuple[models.Direction, int]:
+        """Like multi_max.iterative_deepening, with the work split between
+        the workers."""
+        results, sim = self._search(
+            board, range(1, max_depth + 1), deadline, simulation_type, rules
+        )
+        if len(results) == 0:
+            return multi_max.first_safe_direction(sim), 0
+        return merge(sim, results[-1])[1], len(results)
+
+
+def merge(
+    sim: Simulation, results: Mapping[JointMove, multi_max.Result]
+) -> Tuple[multi_max.Result, models.Direction | None]:
+    """Combine the results below each first turn joint move.
+
+    This makes the same choices SnakeDecision makes at the root: each snake in
+    turn picks the direction that is best for itself, and the first of equally
+    good directions wins.
+
+    Returns:
+        Tuple[multi_max.Result, models.Direction | None]: The result the root
+            leads to and the first snake's best direction.
+    """
+    obvious_death = multi_max.SnakeDecision.LeafNodeType(sim).get_result()
+
+    def decide(snk_id: int, prefix: JointMove):
+        if snk_id >= len(sim.snake_ids):
+            return results[prefix], None
+        if sim.snake_is_dead(snk_id):
+            return decide(snk_id + 1, prefix + (None,))
+
+        best_value = None
+        best_result = None
+        best_direction = None
+        for d, is_obvious_death in multi_max.move_options(sim, snk_id):
+            if is_obvious_death:
+                result = obvious_death
+            else:
+                i = models.CARDINAL_FOUR.index(d)
+                result = decide(snk_id + 1, prefix + (i,))[0]
+            value = result.evaluate_for(snk_id)
+            if best_value is None or value > best_value:
+                best_value = value
+                best_result = result
+                best_direction = d
+        return best_result, best_direction
+
+    return decide(0, ())
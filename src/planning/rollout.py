@@ -0,0 +1,150 @@
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src import models
+from src.planning.batch_simulation import BatchSimulation
+from src.planning.deadline import Deadline
+from src.planning.simulation import FoodSpawns, ParsedBoard, Rules, Simulation
+
+# How many turns each playout runs for.
+ROLLOUT_DEPTH = 20
+# Playouts per root direction in each round. A round is one BatchSimulation,
+# and the deadline is checked between rounds.
+PLAYOUTS_PER_ROUND = 128
+
+
+class DirectionStats:
+    """What happened to the first snake in the playouts after one first move."""
+
+    def __init__(self, direction: models.Direction):
+        self.direction = direction
+        self.playouts = 0
+        # Playouts the first snake was still alive at the end of
+        self.survived = 0
+        # Summed over all playouts
+        self.total_turns_alive = 0
+        self.total_length = 0
+
+    def add(self, turns_alive: np.ndarray, alive: np.ndarray, lengths: np.ndarray):
+        self.playouts += len(turns_alive)
+        self.survived += int(np.count_nonzero(alive))
+        self.total_turns_alive += int(turns_alive.sum())
+        self.total_length += int(lengths.sum())
+
+    @property
+    def survival_rate(self) -> float:
+        return self.survived / self.playouts if self.playouts else 0.0
+
+    @property
+    def mean_turns_alive(self) -> float:
+        return self.total_turns_alive / self.playouts if self.playouts else 0.0
+
+    @property
+    def mean_length(self) -> float:
+        return self.total_length / self.playouts if self.playouts else 0.0
+
+    def score(self) -> Tuple[float, float]:
+        """Higher is better. Living longer first, then growing."""
+        return (self.mean_turns_alive, self.mean_length)
+
+    def __repr__(self):
+        return (
+            f"<DirectionStats {self.direction.name}: {self.playouts} playouts,"
+            f" {self.survival_rate:.0%} survived,"
+            f" {self.mean_turns_alive:.1f} turns, {self.mean_length:.1f} long>"
+        )
+
+
+def random_safe_moves(batch: BatchSimulation, rng: np.random.Generator) -> np.ndarray:
+    """A random move for every snake, avoiding walls and bodies if it can.
+
+    Returns:
+        np.ndarray: (batch, snakes) indices into CARDINAL_FOUR.
+    """
+    safe = batch.safe_moves()
+    # Random priorities, with every safe move ahead of every unsafe one
+    priorities = rng.random(safe.shape) + safe
+    return np.argmax(priorities, axis=2)
+
+
+def root_directions(sim: Simulation) -> List[int]:
+    """Indices into CARDINAL_FOUR worth trying for the first snake."""
+    options = [
+        i for i, d in enumerate(models.CARDINAL_FOUR) if not sim.is_obvious_death(0, d)
+    ]
+    return options or list(range(len(models.CARDINAL_FOUR)))
+
+
+def run_rollouts(
+    board: models.Board | ParsedBoard,
+    stats: Dict[int, DirectionStats],
+    playouts: int,
+    depth: int,
+    rng: np.random.Generator,
+    rules: Rules = Rules(),
+):
+    """Play one round of playouts after each first move in stats.
+
+    New food is sampled in every playout, whatever rules.food_spawns says.
+    """
+    directions = list(stats)
+    rules = rules._replace(
+        food_spawns=FoodSpawns.SAMPLED, seed=int(rng.integers(1 << 63))
+    )
+    batch = BatchSimulation(
+        board, batch_size=playouts * len(directions), max_depth=depth, rules=rules
+    )
+    first = np.repeat(directions, playouts)
+
+    turns_alive = np.zeros(batch.batch_size, dtype=np.int32)
+    for turn in range(depth):
+        moves = random_safe_moves(batch, rng)
+        if turn == 0:
+            moves[:, 0] = first
+        batch.step(moves)
+        alive = batch.alive[:, 0]
+        turns_alive += alive
+        if not alive.any():
+            break
+
+    alive = batch.alive[:, 0]
+    for block, direction in enumerate(directions):
+        games = slice(block * playouts, (block + 1) * playouts)
+        stats[direction].add(turns_alive[games], alive[games], batch.lengths[games, 0])
+
+
+def ideal_direction(
+    board: models.Board | ParsedBoard,
+    deadline: Deadline,
+    depth: int = ROLLOUT_DEPTH,
+    playouts_per_round: int = PLAYOUTS_PER_ROUND,
+    seed: int | None = None,
+    rules: Rules = Rules(),
+) -> Tuple[models.Direction, List[DirectionStats]]:
+    """Pick the first snake's move by playing random games until the deadline.
+
+    Every other snake moves randomly too, but nobody walks into a wall or a
+    body unless they have to. At least one round is always played, and no
+    round is started that would likely run past the deadline.
+
+    The playouts take hazard damage from rules and sample new food, but see
+    BatchSimulation for what they leave out.
+
+    Returns:
+        Tuple[models.Direction, List[DirectionStats]]: The best direction, and
+            the stats for every direction that was tried.
+    """
+    rng = np.random.default_rng(seed)
+    sim = Simulation(board, max_depth=0, rules=rules)
+    stats = {i: DirectionStats(models.CARDINAL_FOUR[i]) for i in root_directions(sim)}
+    while True:
+        start = time.monotonic()
+        run_rollouts(board, stats, playouts_per_round, depth, rng, rules)
+        # Don't start a round that probably won't finish in time.
+        round_ms = (time.monotonic() - start) * 1000
+        if deadline.remaining_ms() < round_ms:
+            break
+    best = max(stats.values(), key=DirectionStats.score)
+    return best.direction, list(stats.values())
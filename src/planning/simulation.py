@@ -1,10 +1,126 @@
-from typing import Iterable, Mapping
+import enum
+import itertools
+from typing import Iterable, List, Mapping, NamedTuple, Self
 
 import src.models as models
+from src.planning import cells, zobrist
 from src.planning.temporal_body import TemporalBody
 
 MAX_HEALTH = 100
 
+# How many turns of history tables to allocate before the search needs them.
+INITIAL_TABLE_TURNS = 8
+
+_MASK_64 = (1 << 64) - 1
+
+
+class ParsedSnake(NamedTuple):
+    id: str
+    name: str
+    health: int
+    body: List[models.Coord]
+
+
+class ParsedBoard(NamedTuple):
+    """The parts of a models.Board that a Simulation reads.
+
+    Search code can take one of these anywhere it takes a models.Board.
+    """
+
+    width: int
+    height: int
+    food: List[models.Coord]
+    hazards: List[models.Coord]
+    snakes: List[ParsedSnake]
+
+
+class FoodSpawns(enum.Enum):
+    """How a Simulation models new food appearing."""
+
+    # No food ever appears.
+    NONE = 0
+    # Food appears when a random draw says it does, like in a real game. The
+    # draws come from the game turn and the seed, so they are the same every
+    # time a turn is reached, and no move a snake makes can change them.
+    SAMPLED = 1
+    # Food appears at the expected rate: with a 15% chance, one every 6 or 7
+    # turns. There's no luck involved, so a search doesn't have to branch on
+    # it.
+    EXPECTED = 2
+
+
+class Rules(NamedTuple):
+    """Ruleset settings a Simulation plays by. The defaults are the standard
+    ruleset's, except that food spawning is off."""
+
+    hazard_damage_per_turn: int = 14
+    # Royale only, 0 if the safe area never shrinks
+    shrink_every_n_turns: int = 0
+    # The game turn of the board the Simulation starts from
+    start_turn: int = 0
+    minimum_food: int = 1
+    # Percent chance of a food appearing on a turn with at least minimum_food
+    food_spawn_chance: int = 15
+    # Which model of food spawning to use, and its seed
+    food_spawns: FoodSpawns = FoodSpawns.NONE
+    seed: int = 0
+
+    @classmethod
+    def from_ruleset(cls, ruleset: models.Ruleset, turn: int) -> Self:
+        settings = ruleset.settings
+        return cls(
+            hazard_damage_per_turn=settings.hazard_damage_per_turn,
+            shrink_every_n_turns=(
+                settings.shrink_every_n_turns if ruleset.name == "royale" else 0
+            ),
+            start_turn=turn,
+            minimum_food=settings.minimum_food,
+            food_spawn_chance=settings.food_spawn_chance,
+        )
+
+
+def parse_rules(data: dict) -> Rules:
+    """Read the rules from a request's JSON.
+
+    Args:
+        data (dict): The whole request, both the game and the turn are needed.
+    """
+    return Rules.from_ruleset(models.Ruleset(data["game"]["ruleset"]), data["turn"])
+
+
+def parse_board(data: dict, you_id: str | None = None) -> ParsedBoard:
+    """Read the board from a request's JSON in a single pass.
+
+    Unlike models.Board, this skips the Tile grid, and every Coord comes from
+    the shared cell table instead of being allocated.
+
+    Args:
+        data (dict): The "board" object of the request.
+        you_id (str | None): If given, this snake is moved first, so it gets
+            simple_id 0.
+    """
+    width = data["width"]
+    height = data["height"]
+    table = cells.cells_for(width, height)
+    snakes = [
+        ParsedSnake(
+            snk["id"],
+            snk["name"],
+            snk["health"],
+            [table.at(pt["x"], pt["y"]) for pt in snk["body"]],
+        )
+        for snk in data["snakes"]
+    ]
+    if you_id is not None:
+        snakes.sort(key=lambda snk: snk.id != you_id)
+    return ParsedBoard(
+        width,
+        height,
+        [table.at(pt["x"], pt["y"]) for pt in data["food"]],
+        [table.at(pt["x"], pt["y"]) for pt in data["hazards"]],
+        snakes,
+    )
+
 
 class Simulation:
     """Simulate a game of BattleSnake
@@ -22,15 +138,22 @@ class Simulation:
     bodies
     healths
     food
+    hazards
+    num_dead
 
     """
 
-    def __init__(self, board: models.Board, max_depth=100):
+    def __init__(
+        self,
+        board: models.Board | ParsedBoard,
+        max_depth=100,
+        rules: Rules = Rules(),
+    ):
         self.turn = 0
         # NOTE: max_depth is the maximum turn number
         # This means that with max_depth, turn 0 is the only valid turn.
         # Calling do_move or do_turn when turn == max_depth will error.
-        # The arrays should be size max_depth+1 to initialize turn 0 correctly.
+        # The per-turn tables never grow past max_depth+1 turns.
         self.max_depth = max_depth
         self.width = board.width
         self.height = board.height
@@ -47,25 +170,68 @@ class Simulation:
         self.snake_ids = list(range(len(live_snakes)))
         self.names = [snk.name for snk in live_snakes]
 
-        # bodies that keep track of history
-        self.bodies = [TemporalBody(snk.body) for snk in live_snakes]
+        # Every Coord in the simulation comes from this table, so none are
+        # allocated during search and they can be compared with `is`.
+        self._cells = cells.cells_for(self.width, self.height)
 
-        # tables where each row is one turn, column is that snake's value
-        num_snakes = len(live_snakes)
-        # First row is starting health
-        self._t_health = [[snk.health for snk in live_snakes]] + [
-            [None] * num_snakes for _ in range(self.max_depth)
+        # bodies that keep track of history
+        self.bodies = [
+            TemporalBody([self._cells.intern(c) for c in snk.body])
+            for snk in live_snakes
         ]
 
-        # self._t_move_choices[t] are choices received on turn t
-        # when these choices are applied, it becomes turn t+1
-        self._t_move_choices = [[None] * num_snakes for _ in range(self.max_depth + 1)]
-
-        # List of food that's available
-        self._t_food = [list(board.food)] + [[] for _ in range(self.max_depth)]
-
-        # List of snakes that grew at the start of turn i
-        self._t_grown_snakes = [[] for _ in range(self.max_depth + 1)]
+        # How many body segments other than heads cover each cell, and how
+        # many heads are on each cell, indexed like self._cells. Dead snakes'
+        # bodies stay on the board, so they're counted too. Kept up to date as
+        # snakes move and grow, so collisions are a lookup instead of a scan.
+        self._occupancy = [0] * len(self._cells.coords)
+        self._head_counts = [0] * len(self._cells.coords)
+        for body in self.bodies:
+            self._head_counts[self._cells.index(body.head())] += 1
+            for segment in itertools.islice(body.current_body, 1, None):
+                self._occupancy[self._cells.index(segment)] += 1
+
+        # Tables with a row for each turn. Only turn 0 exists to start with,
+        # more rows are added as the search goes deeper, up to max_depth.
+        self._num_snakes = num_snakes = len(live_snakes)
+        self._table_turns = 1
+        # Flat tables, snake i's value on turn t is at t * num_snakes + i.
+        # Health of each snake
+        self._health = [snk.health for snk in live_snakes]
+        # Moves received on turn t, as an index into CARDINAL_FOUR, or -1 if
+        # there isn't one. When these are applied, it becomes turn t+1
+        self._move_choices = [-1] * num_snakes
+
+        # Bitmask of the cells holding food, indexed like self._cells
+        food = 0
+        for f in board.food:
+            food |= 1 << self._cells.index(f)
+        self._t_food = [food]
+
+        # Hazard damage on each cell, indexed like self._cells, for each number
+        # of times the safe area has shrunk since turn 0. Stacked hazards do
+        # damage once per stack. Built as the search first gets to them.
+        self.rules = rules
+        hazard_damage = [0] * len(self._cells.coords)
+        for hazard in board.hazards:
+            hazard_damage[self._cells.index(hazard)] += rules.hazard_damage_per_turn
+        self._hazard_damage = [hazard_damage]
+        self._has_hazards = any(hazard_damage) or rules.shrink_every_n_turns > 0
+
+        # Bitmask of the snakes that grew at the start of turn i
+        self._t_grown = [0]
+
+        # How many snakes are dead on turn i
+        self._t_num_dead = [sum(1 for snk in live_snakes if snk.health <= 0)]
+        # The last turn each snake was alive on. Only meaningful once it's
+        # dead, so it never needs undoing.
+        self._last_alive = [0] * num_snakes
+
+        # Zobrist hash of the position at the start of each turn
+        self._zobrist = zobrist.keys_for(
+            self.width, self.height, num_snakes, MAX_HEALTH
+        )
+        self._t_hash = [self._compute_hash(board.food)]
 
         # 2d array of board state
         # self.queue_grid = []
@@ -77,51 +243,151 @@ class Simulation:
 
     @property
     def healths(self) -> Mapping[int, int]:
-        return self._t_health[self.turn]
+        n = self._num_snakes
+        return self._health[self.turn * n : (self.turn + 1) * n]
 
     @property
     def food(self) -> Iterable[models.Coord]:
-        return self._t_food[self.turn]
+        food = []
+        bits = self._t_food[self.turn]
+        while bits:
+            low_bit = bits & -bits
+            food.append(self._cells.coords[low_bit.bit_length() - 1])
+            bits ^= low_bit
+        return food
+
+    @property
+    def hazards(self) -> Iterable[models.Coord]:
+        damage = self._hazardDamage(self.turn)
+        return [c for i, c in enumerate(self._cells.coords) if damage[i]]
+
+    def _hazardDamage(self, turn: int) -> List[int]:
+        """Hazard damage on each cell on the given turn."""
+        shrink_every = self.rules.shrink_every_n_turns
+        if shrink_every <= 0:
+            return self._hazard_damage[0]
+        start = self.rules.start_turn
+        shrinks = (start + turn) // shrink_every - start // shrink_every
+        while len(self._hazard_damage) <= shrinks:
+            self._hazard_damage.append(self._shrink(self._hazard_damage[-1]))
+        return self._hazard_damage[shrinks]
+
+    def _shrink(self, damage: List[int]) -> List[int]:
+        """Hazard damage after the safe area shrinks once more.
+
+        The side that shrinks is random, so every side is assumed to. That
+        keeps searches off the edge of the safe area when it's about to go.
+        """
+        cells = self._cells
+        safe = [
+            c for i, c in enumerate(cells.coords) if cells.on_board[i] and not damage[i]
+        ]
+        shrunk = list(damage)
+        if not safe:
+            return shrunk
+        left = min(c.x for c in safe)
+        right = max(c.x for c in safe)
+        bottom = min(c.y for c in safe)
+        top = max(c.y for c in safe)
+        for c in safe:
+            if c.x in (left, right) or c.y in (bottom, top):
+                shrunk[cells.index(c)] = self.rules.hazard_damage_per_turn
+        return shrunk
+
+    @property
+    def zobrist_hash(self) -> int:
+        """Hash of the current position. Equal positions have equal hashes, no
+        matter which moves were made to reach them."""
+        return self._t_hash[self.turn]
 
     def is_obvious_death(self, snk_id: int, d: models.Direction):
         body = self.bodies[snk_id]
-        new_head = models.Coord(
-            {
-                "x": body.head().x + d.rel_x,
-                "y": body.head().y + d.rel_y,
-            }
-        )
-        if new_head == body.current_body[1]:
+        cells = self._cells
+        new_head = cells.index(body.head()) + d.rel_y * cells.stride + d.rel_x
+        if cells.coords[new_head] is body.current_body[1]:
             # Back on the neck
             return True
-        if not (0 <= new_head.x < self.width and 0 <= new_head.y < self.height):
+        if not cells.on_board[new_head]:
             # Out of bounds
             return True
-        return False
+        if self._head_counts[new_head] and self._liveHeadAt(cells.coords[new_head]):
+            # That head's neck will be here next turn
+            return True
+        if self._occupancy[new_head] == 0:
+            return False
+        # Into a body. Every segment stays where it is except live snakes'
+        # tails, which move out of the way unless they're stacked.
+        return self._occupancy[new_head] > self._vacatingTails(cells.coords[new_head])
+
+    def _liveHeadAt(self, coord: models.Coord) -> bool:
+        return any(
+            body.head() is coord and not self.snake_is_dead(snk_id)
+            for snk_id, body in enumerate(self.bodies)
+        )
+
+    def _vacatingTails(self, coord: models.Coord) -> int:
+        """How many live snakes' tails will leave this cell next turn."""
+        count = 0
+        for snk_id, body in enumerate(self.bodies):
+            if (
+                body.tail() is coord
+                and len(body) > 1
+                and body.current_body[-2] is not coord
+                and not self.snake_is_dead(snk_id)
+            ):
+                count += 1
+        return count
+
+    @property
+    def num_dead(self) -> int:
+        return self._t_num_dead[self.turn]
+
+    def health(self, snk_id: int) -> int:
+        return self._health[self.turn * self._num_snakes + snk_id]
 
     def turns_alive(self, snk_id: int) -> int:
         """How long a snake has lived for. If still alive this is self.turn"""
-        for i in range(self.turn, -1, -1):
-            if self._t_health[i][snk_id] > 0:
-                return i
-        return 0
+        if self._health[self.turn * self._num_snakes + snk_id] > 0:
+            return self.turn
+        return self._last_alive[snk_id]
 
     def do_move(self, snk_id: int, d: models.Direction):
         if self.turn == self.max_depth:
             raise AssertionError("Cannot call do_move when simulation is at max depth.")
-        self._t_move_choices[self.turn][snk_id] = d
+        self._move_choices[self.turn * self._num_snakes + snk_id] = zobrist.DELTA_INDEX[
+            (d.rel_x, d.rel_y)
+        ]
 
     def undo_move(self, snk_id: int):
-        self._t_move_choices[self.turn][snk_id] = None
+        self._move_choices[self.turn * self._num_snakes + snk_id] = -1
+
+    def _growTables(self, turns: int):
+        """Make room in the per-turn tables for this many turns."""
+        extra = turns - self._table_turns
+        n = self._num_snakes
+        self._health.extend([0] * (extra * n))
+        self._move_choices.extend([-1] * (extra * n))
+        self._t_food.extend([0] * extra)
+        self._t_grown.extend([0] * extra)
+        self._t_num_dead.extend([0] * extra)
+        self._t_hash.extend([None] * extra)
+        self._table_turns = turns
 
     def do_turn(self):
         if self.turn == self.max_depth:
             raise AssertionError("Cannot call do_turn when simulation is at max depth.")
+        if self.turn + 1 == self._table_turns:
+            self._growTables(
+                min(self.max_depth + 1, max(2 * self._table_turns, INITIAL_TABLE_TURNS))
+            )
         self._moveSnakes()
         self._reduceSnakeHealth()
+        self._damageHazards()
         self._maybeFeedSnakes()
-        # self._maybeSpawnFood()
+        self._maybeSpawnFood()
         self._maybeEliminateSnakes()
+        self._recordDeaths()
+        self._updateHash()
         self.turn += 1
 
     def undo_turn(self):
@@ -129,80 +395,206 @@ class Simulation:
             raise AssertionError("Cannot undo beyond the start of simulation.")
         self.turn -= 1
         self._undo_maybeEliminateSnakes()
-        # self._undo_maybeSpawnFood()
+        self._undo_maybeSpawnFood()
         self._undo_maybeFeedSnakes()
+        self._undo_damageHazards()
         self._undo_reduceSnakeHealth()
         self._undo_moveSnakes()
 
     def snake_is_dead(self, snk_id):
-        return self._t_health[self.turn][snk_id] <= 0
+        return self._health[self.turn * self._num_snakes + snk_id] <= 0
 
     def _moveSnakes(self):
+        cells = self._cells
+        occupancy = self._occupancy
+        head_counts = self._head_counts
+        move_choices = self._move_choices
+        first = self.turn * self._num_snakes
         for snk_id in self.snake_ids:
             # Skip dead snakes
             if self.snake_is_dead(snk_id):
                 continue
 
             # Raise error if no move was submitted
-            if self._t_move_choices[self.turn][snk_id] is None:
+            move = move_choices[first + snk_id]
+            if move < 0:
                 raise ValueError(f"Snake {snk_id} did not submit a move.")
 
-            d = self._t_move_choices[self.turn][snk_id]
             body = self.bodies[snk_id]
-            new_head = models.Coord(
-                {
-                    "x": body.head().x + d.rel_x,
-                    "y": body.head().y + d.rel_y,
-                }
-            )
-            body.add_head(new_head)
+            old_head = cells.index(body.head())
+            new_head = old_head + cells.offsets[move]
+            body.add_head(cells.coords[new_head])
             body.del_tail()
 
+            # The old head becomes a body segment, the old tail is gone.
+            occupancy[old_head] += 1
+            occupancy[cells.index(body.old_tails[-1])] -= 1
+            head_counts[old_head] -= 1
+            head_counts[new_head] += 1
+
     def _undo_moveSnakes(self):
+        cells = self._cells
+        occupancy = self._occupancy
+        head_counts = self._head_counts
         for snk_id in self.snake_ids:
             if self.snake_is_dead(snk_id):
                 continue
             body = self.bodies[snk_id]
+            new_head = cells.index(body.head())
             body.undo_add_head()
             body.undo_del_tail()
+            old_head = cells.index(body.head())
+
+            occupancy[old_head] -= 1
+            occupancy[cells.index(body.tail())] += 1
+            head_counts[new_head] -= 1
+            head_counts[old_head] += 1
 
     def _reduceSnakeHealth(self):
+        health = self._health
+        now = self.turn * self._num_snakes
+        later = now + self._num_snakes
         for snk_id in self.snake_ids:
-            old_health = self._t_health[self.turn][snk_id]
-            if self.snake_is_dead(snk_id):
-                self._t_health[self.turn + 1][snk_id] = old_health
+            old_health = health[now + snk_id]
+            if old_health <= 0:
+                health[later + snk_id] = old_health
             else:
-                self._t_health[self.turn + 1][snk_id] = old_health - 1
+                health[later + snk_id] = old_health - 1
 
     def _undo_reduceSnakeHealth(self):
+        # The next turn's row is always written before it's read again.
+        pass
+
+    def _damageHazards(self):
+        # Most boards have no hazards at all.
+        if not self._has_hazards:
+            return
+        damage = self._hazardDamage(self.turn)
+        food = self._t_food[self.turn]
+        health = self._health
+        later = (self.turn + 1) * self._num_snakes
+        stride = self._cells.stride
         for snk_id in self.snake_ids:
-            self._t_health[self.turn + 1][snk_id] = None
+            # Dead and starved snakes are past caring
+            if health[later + snk_id] <= 0:
+                continue
+            head = self.bodies[snk_id].head()
+            cell = (head.y + 1) * stride + head.x + 1
+            # A snake eating food in a hazard takes no damage
+            if damage[cell] and not food >> cell & 1:
+                health[later + snk_id] = max(0, health[later + snk_id] - damage[cell])
+
+    def _undo_damageHazards(self):
+        # Like health reduction, it only wrote the next turn's row.
+        pass
 
     def _maybeFeedSnakes(self):
-        for food in self._t_food[self.turn]:
-            food_eaten = False
+        # Only live heads can eat, so test each of them against the food mask
+        # rather than looking for a head on every piece of food.
+        food = self._t_food[self.turn]
+        eaten = 0
+        grown = 0
+        if food:
+            health = self._health
+            now = self.turn * self._num_snakes
+            later = now + self._num_snakes
+            stride = self._cells.stride
             for snk_id in self.snake_ids:
                 # Dead snakes can't eat
-                if self.snake_is_dead(snk_id):
+                if health[now + snk_id] <= 0:
                     continue
-                body = self.bodies[snk_id]
-                if body.head().x == food.x and body.head().y == food.y:
-                    food_eaten = True
-                    self._t_health[self.turn + 1][snk_id] = MAX_HEALTH
-                    body.grow()
-                    self._t_grown_snakes[self.turn + 1].append(snk_id)
-            if not food_eaten:
-                self._t_food[self.turn + 1].append(food)
+                head = self.bodies[snk_id].head()
+                head_bit = 1 << ((head.y + 1) * stride + head.x + 1)
+                if food & head_bit:
+                    # Several snakes can eat the same food
+                    eaten |= head_bit
+                    health[later + snk_id] = MAX_HEALTH
+                    self._growSnake(snk_id)
+                    grown |= 1 << snk_id
+        self._t_food[self.turn + 1] = food & ~eaten
+        self._t_grown[self.turn + 1] = grown
 
     def _undo_maybeFeedSnakes(self):
         # any snakes that grew should un-grow
-        for snk_id in self._t_grown_snakes[self.turn + 1]:
-            self.bodies[snk_id].undo_grow()
-        self._t_grown_snakes[self.turn + 1].clear()
-        # clear the food array
-        self._t_food[self.turn + 1].clear()
+        grown = self._t_grown[self.turn + 1]
+        for snk_id in self.snake_ids:
+            if grown >> snk_id & 1:
+                self._undo_growSnake(snk_id)
+
+    def _maybeSpawnFood(self):
+        rules = self.rules
+        if rules.food_spawns is FoodSpawns.NONE:
+            return
+        food = self._t_food[self.turn + 1]
+        num_food = food.bit_count()
+        if num_food < rules.minimum_food:
+            spawn = rules.minimum_food - num_food
+        elif rules.food_spawns is FoodSpawns.SAMPLED:
+            spawn = 1 if self._draw(0) % 100 < rules.food_spawn_chance else 0
+        else:
+            # How many times the chance adds up past a whole food this turn,
+            # counted from the start of the game so it doesn't depend on
+            # where the search started.
+            game_turn = self.rules.start_turn + self.turn
+            chance = rules.food_spawn_chance
+            spawn = (game_turn + 1) * chance // 100 - game_turn * chance // 100
+        if spawn:
+            self._t_food[self.turn + 1] = food | self._placeFood(food, spawn)
+
+    def _undo_maybeSpawnFood(self):
+        # The food table is per turn, so there's nothing to undo.
+        pass
+
+    def _draw(self, i: int) -> int:
+        """A random 64 bit number for this game turn and seed. i picks between
+        several draws on a turn.
+
+        Nothing on the board goes into it. If the moves did, a search could
+        pick moves for the food they make appear.
+        """
+        game_turn = self.rules.start_turn + self.turn
+        x = (self.rules.seed ^ game_turn << 8 ^ i) * 0x9E3779B97F4A7C15 & _MASK_64
+        # splitmix64's finalizer
+        x = (x ^ x >> 30) * 0xBF58476D1CE4E5B9 & _MASK_64
+        x = (x ^ x >> 27) * 0x94D049BB133111EB & _MASK_64
+        return x ^ x >> 31
+
+    def _placeFood(self, food: int, count: int) -> int:
+        """Bitmask of count empty cells for new food.
+
+        Each food goes on the first empty cell at or after a cell picked by a
+        draw. Bodies can only push food along by covering the picked cell, so
+        snakes can't steer where it lands.
+        """
+        cells = self._cells
+        taken = food
+        for body in self.bodies:
+            for segment in body.current_body:
+                taken |= 1 << cells.index(segment)
+        board = [i for i, on in enumerate(cells.on_board) if on]
+        placed = 0
+        for i in range(count):
+            start = self._draw(i + 1) % len(board)
+            for j in range(len(board)):
+                cell = board[(start + j) % len(board)]
+                if not taken >> cell & 1:
+                    placed |= 1 << cell
+                    taken |= 1 << cell
+                    break
+        return placed
+
+    def _growSnake(self, snk_id: int):
+        body = self.bodies[snk_id]
+        body.grow()
+        self._occupancy[self._cells.index(body.tail())] += 1
+
+    def _undo_growSnake(self, snk_id: int):
+        body = self.bodies[snk_id]
+        self._occupancy[self._cells.index(body.tail())] -= 1
+        body.undo_grow()
 
     def _maybeEliminateSnakes(self):
+        later = (self.turn + 1) * self._num_snakes
         # Snakes that starve or go out of bounds die first
         for snk_id in self.snake_ids:
             # Skip already eliminated snakes
@@ -210,14 +602,14 @@ class Simulation:
                 continue
             # Check for bounds
             elif self._snakeIsOutOfBounds(snk_id):
-                self._t_health[self.turn + 1][snk_id] = 0
+                self._health[later + snk_id] = 0
 
         # All remaining eliminations happen simultaneously
         # This is so that eliminated snakes cause others to be eliminated
         collisions = []
         for snk_id in self.snake_ids:
             # Skip dead snakes
-            if self._t_health[self.turn + 1][snk_id] == 0:
+            if self._health[later + snk_id] == 0:
                 continue
             # Check for body
             elif self._snakeHasBodyCollided(snk_id):
@@ -228,10 +620,10 @@ class Simulation:
 
         # Kill snakes that collided
         for snk_id in collisions:
-            self._t_health[self.turn + 1][snk_id] = 0
+            self._health[later + snk_id] = 0
 
     def _snakeIsOutOfHealth(self, snk_id: int):
-        return self._t_health[self.turn + 1][snk_id] == 0
+        return self._health[(self.turn + 1) * self._num_snakes + snk_id] == 0
 
     def _snakeIsOutOfBounds(self, snk_id: int):
         x = self.bodies[snk_id].head().x
@@ -239,27 +631,104 @@ class Simulation:
         return not 0 <= x < self.width or not 0 <= y < self.height
 
     def _snakeHasBodyCollided(self, snk_id: int):
-        x = self.bodies[snk_id].head().x
-        y = self.bodies[snk_id].head().y
-        for body in self.bodies:
-            # Ignore heads, we'll check that in other places
-            for segment in body.current_body[1:]:
-                if x == segment.x and y == segment.y:
-                    return True
-        return False
+        # Heads aren't counted, we'll check that in other places
+        head = self._cells.index(self.bodies[snk_id].head())
+        return self._occupancy[head] > 0
 
     def _snakeHasLostHeadToHead(self, snk_id: int):
         this_body = self.bodies[snk_id]
+        # Almost every turn, nobody else is on this cell.
+        if self._head_counts[self._cells.index(this_body.head())] == 1:
+            return False
         for other_id, body in enumerate(self.bodies):
             if other_id == snk_id:
                 continue
-            if body.head() == this_body.head() and len(body) >= len(this_body):
+            if body.head() is this_body.head() and len(body) >= len(this_body):
                 return True
         return False
 
     def _undo_maybeEliminateSnakes(self):
         pass
 
+    def _recordDeaths(self):
+        health = self._health
+        now = self.turn * self._num_snakes
+        later = now + self._num_snakes
+        num_dead = self._t_num_dead[self.turn]
+        for snk_id in self.snake_ids:
+            if health[now + snk_id] > 0 and health[later + snk_id] <= 0:
+                self._last_alive[snk_id] = self.turn
+                num_dead += 1
+        self._t_num_dead[self.turn + 1] = num_dead
+
+    def _compute_hash(self, food: Iterable[models.Coord]) -> int:
+        """Zobrist hash of the current position, built from scratch."""
+        keys = self._zobrist
+        h = 0
+        for snk_id, body in enumerate(self.bodies):
+            h ^= keys.head[snk_id][keys.cell(body.head())]
+            previous = body.head()
+            for segment in itertools.islice(body.current_body, 1, None):
+                if segment != previous:
+                    d = zobrist.DELTA_INDEX[
+                        (previous.x - segment.x, previous.y - segment.y)
+                    ]
+                    h ^= keys.segment[snk_id][keys.cell(segment) * 4 + d]
+                previous = segment
+            h ^= keys.length[snk_id][len(body)]
+            h ^= keys.health[snk_id][self.healths[snk_id]]
+        for f in food:
+            h ^= keys.food[keys.cell(f)]
+        return h
+
+    def _updateHash(self):
+        """Work out the next turn's hash from what changed this turn."""
+        keys = self._zobrist
+        h = self._t_hash[self.turn]
+        health = self._health
+        now = self.turn * self._num_snakes
+        later = now + self._num_snakes
+        grown_snakes = self._t_grown[self.turn + 1]
+        for snk_id in self.snake_ids:
+            # Dead snakes don't change
+            if health[now + snk_id] <= 0:
+                continue
+            body = self.bodies[snk_id]
+
+            # The old head becomes a segment pointing at the new head. The keys
+            # index cells the same way as self._cells.
+            move = self._move_choices[now + snk_id]
+            new_head = keys.cell(body.head())
+            old_head = new_head - self._cells.offsets[move]
+            h ^= keys.head[snk_id][old_head]
+            h ^= keys.head[snk_id][new_head]
+            h ^= keys.segment[snk_id][old_head * 4 + move]
+
+            # The old tail's segment is gone, unless it was stacked
+            grew = grown_snakes >> snk_id & 1
+            old_tail = body.old_tails[-1]
+            new_tail = body.current_body[-2] if grew else body.tail()
+            if old_tail != new_tail:
+                to_new_tail = zobrist.DELTA_INDEX[
+                    (new_tail.x - old_tail.x, new_tail.y - old_tail.y)
+                ]
+                h ^= keys.segment[snk_id][keys.cell(old_tail) * 4 + to_new_tail]
+
+            if grew:
+                h ^= keys.length[snk_id][len(body) - 1]
+                h ^= keys.length[snk_id][len(body)]
+
+            h ^= keys.health[snk_id][health[now + snk_id]]
+            h ^= keys.health[snk_id][health[later + snk_id]]
+
+        # Food that was eaten or spawned
+        changed = self._t_food[self.turn] ^ self._t_food[self.turn + 1]
+        while changed:
+            low_bit = changed & -changed
+            h ^= keys.food[low_bit.bit_length() - 1]
+            changed ^= low_bit
+        self._t_hash[self.turn + 1] = h
+
     def render(self) -> str:
         grid = [["." for _ in range(self.height)] for _ in range(self.width)]
 
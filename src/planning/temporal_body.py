@@ -5,8 +5,15 @@ import src.models as models
 
 
 class TemporalBody:
+    """A snake's body that can undo its changes.
+
+    The body is a deque, so adding a head and removing a tail are O(1) however
+    long the snake is. current_body supports indexing, negative indices
+    included, but not slicing. Use itertools.islice to skip segments.
+    """
+
     def __init__(self, body: Iterable[models.Coord]):
-        self.current_body = list(body)
+        self.current_body = queue.deque(body)
         self.old_tails = queue.deque()
 
     def __len__(self):
@@ -22,10 +29,10 @@ class TemporalBody:
         return self.current_body[-1]
 
     def add_head(self, loc: models.Coord):
-        self.current_body.insert(0, loc)
+        self.current_body.appendleft(loc)
 
     def undo_add_head(self):
-        self.current_body.pop(0)
+        self.current_body.popleft()
 
     def del_tail(self):
         self.old_tails.append(self.current_body.pop())
@@ -0,0 +1,163 @@
+import itertools
+import threading
+from typing import List
+
+from src.planning import cells
+from src.planning.simulation import Simulation
+from src.planning.transposition import TranspositionTable
+
+# Turns until a cell frees up, for cells that never will: off the board, or
+# under a dead snake.
+NEVER = 1 << 30
+# Owner of a cell that two or more snakes reach on the same turn.
+CONTESTED = -2
+UNCLAIMED = -1
+
+
+class TerritoryCounter:
+    """Flood fills over a Simulation's board, for scoring leaves.
+
+    Bodies are walls, except that a segment counts as gone once the tail has
+    had time to pass it. The segment k cells from the tail is gone after k + 1
+    turns, as long as the snake doesn't eat on the way.
+
+    The buffers are flat lists indexed like cells.CellTable, made once and
+    reset with a slice copy before every fill. Voronoi results are memoized
+    by position hash, since many leaves of a search are the same position.
+    """
+
+    def __init__(self, width: int, height: int, table_bits: int = 14):
+        self._cells = cells.cells_for(width, height)
+        num_cells = len(self._cells.coords)
+        # Cells off the board are never free, cells on it start free.
+        self._empty = [0 if on else NEVER for on in self._cells.on_board]
+        self._free_at = list(self._empty)
+        self._unvisited = [-1] * num_cells
+        self._dist = list(self._unvisited)
+        self._owner = [UNCLAIMED] * num_cells
+        self._neighbors = [
+            [self._cells.index(n) for n in neighbors]
+            for neighbors in self._cells.neighbors
+        ]
+        self._memo = TranspositionTable(size_bits=table_bits)
+
+    def _markBodies(self, sim: Simulation) -> List[int]:
+        """Fill _free_at for the sim, and return the live snakes' head cells,
+        or -1 for dead snakes."""
+        free_at = self._free_at
+        free_at[:] = self._empty
+        index = self._cells.index
+        heads = []
+        for snk_id, body in enumerate(sim.bodies):
+            segments = body.current_body
+            if sim.snake_is_dead(snk_id):
+                # A dead snake's body stays, but its head can be moved onto,
+                # the same as in Simulation.
+                heads.append(-1)
+                for segment in itertools.islice(segments, 1, None):
+                    free_at[index(segment)] = NEVER
+                continue
+            heads.append(index(segments[0]))
+            turns = len(segments)
+            for segment in segments:
+                i = index(segment)
+                # Stacked segments are gone when the last of them is.
+                if free_at[i] < turns:
+                    free_at[i] = turns
+                turns -= 1
+        return heads
+
+    def reachable_area(self, sim: Simulation, snk_id: int) -> int:
+        """How many cells the snake could get to, ignoring the other snakes'
+        moves. Zero if it's dead."""
+        heads = self._markBodies(sim)
+        start = heads[snk_id]
+        if start < 0:
+            return 0
+        free_at = self._free_at
+        neighbors = self._neighbors
+        dist = self._dist
+        dist[:] = self._unvisited
+        dist[start] = 0
+        frontier = [start]
+        area = 0
+        turn = 0
+        while frontier:
+            turn += 1
+            next_frontier = []
+            for cell in frontier:
+                for n in neighbors[cell]:
+                    if dist[n] < 0 and free_at[n] <= turn:
+                        dist[n] = turn
+                        next_frontier.append(n)
+            area += len(next_frontier)
+            frontier = next_frontier
+        return area
+
+    def voronoi(self, sim: Simulation) -> List[int]:
+        """How many cells each snake gets to strictly before every other snake.
+
+        Cells two snakes reach on the same turn belong to neither, and the
+        fill doesn't continue past them. Dead snakes get nothing.
+        """
+        zobrist_hash = sim.zobrist_hash
+        counts = self._memo.get(zobrist_hash, 0, 0)
+        if counts is not None:
+            return counts
+
+        heads = self._markBodies(sim)
+        free_at = self._free_at
+        neighbors = self._neighbors
+        dist = self._dist
+        owner = self._owner
+        dist[:] = self._unvisited
+        counts = [0] * len(heads)
+        frontier = []
+        for snk_id, head in enumerate(heads):
+            if head < 0:
+                continue
+            if dist[head] == 0:
+                # Already on another head, they collide.
+                owner[head] = CONTESTED
+                continue
+            dist[head] = 0
+            owner[head] = snk_id
+            frontier.append(head)
+
+        turn = 0
+        while frontier:
+            turn += 1
+            next_frontier = []
+            for cell in frontier:
+                snk_id = owner[cell]
+                if snk_id == CONTESTED:
+                    continue
+                for n in neighbors[cell]:
+                    if dist[n] < 0:
+                        if free_at[n] <= turn:
+                            dist[n] = turn
+                            owner[n] = snk_id
+                            counts[snk_id] += 1
+                            next_frontier.append(n)
+                    elif dist[n] == turn and 0 <= owner[n] != snk_id:
+                        counts[owner[n]] -= 1
+                        owner[n] = CONTESTED
+            frontier = next_frontier
+
+        self._memo.put(zobrist_hash, 0, 0, counts)
+        return counts
+
+
+# Counters hold scratch buffers and a memo, so threads can't share them.
+_local = threading.local()
+
+
+def counter_for(width: int, height: int) -> TerritoryCounter:
+    """Every Simulation of the same size on this thread shares a counter."""
+    counters = getattr(_local, "counters", None)
+    if counters is None:
+        counters = _local.counters = {}
+    counter = counters.get((width, height))
+    if counter is None:
+        counter = counters[width, height] = TerritoryCounter(width, height)
+    return counter
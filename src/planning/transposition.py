@@ -0,0 +1,42 @@
+from typing import Any
+
+
+class TranspositionTable:
+    """Fixed size table of search results, keyed by position.
+
+    Entries are looked up by a Simulation's zobrist_hash and turn, and only
+    count as a hit if they were searched to the same depth. Each slot holds a
+    single entry and newer entries replace older ones, so memory use is
+    bounded no matter how long the search runs.
+    """
+
+    def __init__(self, size_bits: int = 16):
+        self._mask = (1 << size_bits) - 1
+        self._slots = [None] * (1 << size_bits)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return sum(1 for slot in self._slots if slot is not None)
+
+    def get(self, zobrist_hash: int, turn: int, depth: int) -> Any:
+        """Stored value for this position and depth, or None."""
+        slot = self._slots[(zobrist_hash ^ turn) & self._mask]
+        if (
+            slot is not None
+            and slot[0] == zobrist_hash
+            and slot[1] == turn
+            and slot[2] == depth
+        ):
+            self.hits += 1
+            return slot[3]
+        self.misses += 1
+        return None
+
+    def put(self, zobrist_hash: int, turn: int, depth: int, value: Any):
+        self._slots[(zobrist_hash ^ turn) & self._mask] = (
+            zobrist_hash,
+            turn,
+            depth,
+            value,
+        )
@@ -0,0 +1,55 @@
+import functools
+import random
+from typing import List
+
+import src.models as models
+
+# Index of each direction in the segment key table, by (rel_x, rel_y).
+DELTA_INDEX = {(d.rel_x, d.rel_y): i for i, d in enumerate(models.CARDINAL_FOUR)}
+
+
+class ZobristKeys:
+    """Random keys for Zobrist hashing a Simulation.
+
+    A position hashes to the XOR of:
+    * a head key for each snake's head cell
+    * a segment key for every other body segment, picked by the cell and the
+      direction that points toward the head. Stacked segments are skipped
+    * a length key and a health key for each snake
+    * a food key for every food
+
+    Given the head, the pointers and the length, the whole body is known. All
+    of these are easy to update one move at a time.
+
+    Cells are indexed on a board padded by one cell on every side, so heads
+    that just moved out of bounds still have a key.
+    """
+
+    def __init__(self, width: int, height: int, num_snakes: int, max_health: int):
+        rng = random.Random(f"zobrist-{width}-{height}-{num_snakes}")
+
+        def keys(n: int) -> List[int]:
+            return [rng.getrandbits(64) for _ in range(n)]
+
+        self.stride = width + 2
+        num_cells = self.stride * (height + 2)
+        self.head = [keys(num_cells) for _ in range(num_snakes)]
+        self.segment = [keys(num_cells * 4) for _ in range(num_snakes)]
+        # A snake can't be longer than the board, plus the stacked segments it
+        # started or just ate with.
+        self.length = [keys(width * height + 4) for _ in range(num_snakes)]
+        self.health = [keys(max_health + 1) for _ in range(num_snakes)]
+        self.food = keys(num_cells)
+
+    def __deepcopy__(self, memo) -> "ZobristKeys":
+        # Keys never change, so copies of a Simulation can share them.
+        return self
+
+    def cell(self, coord: models.Coord) -> int:
+        return (coord.y + 1) * self.stride + coord.x + 1
+
+
+@functools.lru_cache(maxsize=16)
+def keys_for(width: int, height: int, num_snakes: int, max_health: int) -> ZobristKeys:
+    """Keys are the same for every Simulation with the same dimensions."""
+    return ZobristKeys(width, height, num_snakes, max_health)
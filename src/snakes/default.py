@@ -3,6 +3,9 @@ import random
 import cherrypy
 
 import src.models as models
+from src.planning import simulation
+from src.planning.deadline import Deadline
+import config
 
 
 class BattlesnakeServer:
@@ -28,9 +31,13 @@ class BattlesnakeServer:
     @cherrypy.tools.json_in()
     @cherrypy.tools.json_out()
     def move(self):
-        direction = self.handle_move(models.Data(cherrypy.request.json))
+        direction = self.handle_move_json(cherrypy.request.json)
         return models.Move(direction).json()
 
+    def handle_move_json(self, data: dict) -> models.Direction:
+        """Override to read the request yourself instead of from models.Data."""
+        return self.handle_move(models.Data(data))
+
     def handle_move(self, data: models.Data) -> models.Direction:
         possible_directions = models.CARDINAL_FOUR
         direction = random.choice(possible_directions)
@@ -45,3 +52,37 @@ class BattlesnakeServer:
 
     def handle_end(self, data: models.Data):
         print("END")
+
+
+class SearchServer(BattlesnakeServer):
+    """A snake that searches each move until a deadline.
+
+    The deadline is the game's timeout less network_margin_ms, for the
+    response to get back in time. Subclasses implement search_board.
+    """
+
+    def __init__(self, network_margin_ms: float = config.NETWORK_MARGIN_MS):
+        self.network_margin_ms = network_margin_ms
+
+    def handle_move_json(self, data: dict) -> models.Direction:
+        # Start the clock before parsing, that counts against the timeout too.
+        deadline = Deadline(float(data["game"]["timeout"]) - self.network_margin_ms)
+        board = simulation.parse_board(data["board"], you_id=data["you"]["id"])
+        return self.search_board(board, deadline, simulation.parse_rules(data))
+
+    def handle_move(self, data: models.Data) -> models.Direction:
+        deadline = Deadline(data.game.timeout - self.network_margin_ms)
+
+        # Order snakes such that you are first
+        data.board.snakes.sort(key=lambda snk: snk.id != data.you.id)
+        rules = simulation.Rules.from_ruleset(data.game.ruleset, data.turn)
+        return self.search_board(data.board, deadline, rules)
+
+    def search_board(
+        self,
+        board: models.Board | simulation.ParsedBoard,
+        deadline: Deadline,
+        rules: simulation.Rules = simulation.Rules(),
+    ) -> models.Direction:
+        """Best direction for the first snake on the board."""
+        raise NotImplementedError
@@ -0,0 +1,45 @@
+import src.models as models
+from src.snakes.default import SearchServer
+import src.planning.minimax as minimax
+import src.planning.multi_max as multi_max
+from src.planning import simulation
+from src.planning.bitboard_simulation import BitboardSimulation
+from src.planning.deadline import Deadline
+import config
+
+
+class Duncan(SearchServer):
+    """Duel snake. Uses alpha-beta minimax once it is down to one opponent."""
+
+    def __init__(self, network_margin_ms: float = config.NETWORK_MARGIN_MS):
+        super().__init__(network_margin_ms)
+        # How deep the last search got
+        self.calculation_depth = 0
+
+    def handle_index(self):
+        return models.BattlesnakeInfo(
+            author="drzoid",
+            color="#b3002d",
+            head="fang",
+            tail="sharp",
+            version="0.1.0",
+        )
+
+    def search_board(
+        self,
+        board: models.Board | simulation.ParsedBoard,
+        deadline: Deadline,
+        rules: simulation.Rules = simulation.Rules(),
+    ) -> models.Direction:
+        if len(board.snakes) == 2:
+            best_direction, depth = minimax.iterative_deepening(
+                board, deadline, simulation_type=BitboardSimulation, rules=rules
+            )
+            print(f"Duel, looked {depth} steps into future.")
+        else:
+            best_direction, depth = multi_max.iterative_deepening(
+                board, deadline, simulation_type=BitboardSimulation, rules=rules
+            )
+            print(f"Free for all, looked {depth} steps into future.")
+        self.calculation_depth = depth
+        return best_direction
@@ -2,8 +2,6 @@ import math
 from typing import List
 from enum import Enum
 
-import cherrypy
-
 import src.models as models
 from src.snakes.default import BattlesnakeServer
 
@@ -308,8 +306,6 @@ class Medusa(BattlesnakeServer):
         return "ok"
 
     def handle_move(self, data: models.Data) -> models.Direction:
-        data = models.Data(cherrypy.request.json)
-
         snake = self.get_or_make_smart_snake(data, data.you.id)
         direction = snake.move(data)
 
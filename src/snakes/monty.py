@@ -0,0 +1,38 @@
+import src.models as models
+from src.snakes.default import SearchServer
+from src.planning import rollout, simulation
+from src.planning.deadline import Deadline
+import config
+
+
+class Monty(SearchServer):
+    """Free for all snake. Plays random games out from each move it could make.
+
+    The games take hazard damage and sample new food, but the royale safe area
+    never shrinks in them.
+    """
+
+    def __init__(self, network_margin_ms: float = config.NETWORK_MARGIN_MS):
+        super().__init__(network_margin_ms)
+        # How many games the last search played
+        self.playouts = 0
+
+    def handle_index(self):
+        return models.BattlesnakeInfo(
+            author="drzoid",
+            color="#e07b00",
+            head="smart-caterpillar",
+            tail="coffee",
+            version="0.1.0",
+        )
+
+    def search_board(
+        self,
+        board: models.Board | simulation.ParsedBoard,
+        deadline: Deadline,
+        rules: simulation.Rules = simulation.Rules(),
+    ) -> models.Direction:
+        best_direction, stats = rollout.ideal_direction(board, deadline, rules=rules)
+        self.playouts = sum(s.playouts for s in stats)
+        print(f"Played {self.playouts} games: {stats}")
+        return best_direction
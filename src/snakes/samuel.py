@@ -1,12 +1,41 @@
 import src.models as models
-from src.snakes.default import BattlesnakeServer
+from src.snakes.default import SearchServer
 import src.planning.multi_max as multi_max
+from src.planning.bitboard_simulation import BitboardSimulation
+from src.planning import simulation
+from src.planning.deadline import Deadline
+from src.planning.parallel import ParallelSearch
+from src.snakes.worker_pool import WorkerPool
 import config
 
 
-class Samuel(BattlesnakeServer):
-    def __init__(self):
-        self.calculation_depth = 3
+def search(
+    board: models.Board,
+    deadline: Deadline,
+    rules: simulation.Rules = simulation.Rules(),
+):
+    """Samuel's search for the first snake on the board, as run by a worker."""
+    return multi_max.iterative_deepening(
+        board, deadline, simulation_type=BitboardSimulation, rules=rules
+    )
+
+
+class Samuel(SearchServer):
+    def __init__(
+        self,
+        network_margin_ms: float = config.NETWORK_MARGIN_MS,
+        parallel_search: ParallelSearch | None = None,
+        worker_pool: WorkerPool | None = None,
+    ):
+        super().__init__(network_margin_ms)
+        # Splits the search over worker processes if given, otherwise it all
+        # happens on the request thread.
+        self.parallel_search = parallel_search
+        # Runs each search in a worker process of its own if given, so games
+        # don't hold each other up.
+        self.worker_pool = worker_pool
+        # How deep the last search got
+        self.calculation_depth = 0
 
     def handle_index(self):
         return models.BattlesnakeInfo(
@@ -14,30 +43,26 @@ class Samuel(BattlesnakeServer):
             color="#039903",
             head="silly",
             tail="round-bum",
-            version="0.5.0",
+            version="0.6.0",
         )
 
-    def update_calculation_depth(self, data: models.Data):
-        print(f'Latency is "{data.you.latency}"')
-        # First call, no latency
-        if data.you.latency is None:
-            pass
-        # If we are getting dangerously close to the limit, decrease depth.
-        elif data.you.latency == 0.0 or data.you.latency > data.game.timeout * 0.5:
-            self.calculation_depth -= 1
-        # If we have plenty of extra time, look further.
-        elif data.you.latency < data.game.timeout * 0.1:
-            self.calculation_depth += 1
-
-        self.calculation_depth = min(max(self.calculation_depth, 1), 4)
-
-    def handle_move(self, data: models.Data) -> models.Direction:
-        self.update_calculation_depth(data)
-
-        # Order snakes such that you are first
-        data.board.snakes.sort(key=lambda snk: snk.id != data.you.id)
-        best_direction = multi_max.ideal_direction(
-            data.board, depth=self.calculation_depth
-        )
-        print(f"Looking {self.calculation_depth} steps into future.")
+    def search_board(
+        self,
+        board: models.Board | simulation.ParsedBoard,
+        deadline: Deadline,
+        rules: simulation.Rules = simulation.Rules(),
+    ) -> models.Direction:
+        # multi_max can't branch on chance, so food appears at the expected
+        # rate instead.
+        rules = rules._replace(food_spawns=simulation.FoodSpawns.EXPECTED)
+        if self.worker_pool is not None:
+            best_direction, depth = self.worker_pool.search(board, deadline, rules)
+        elif self.parallel_search is not None:
+            best_direction, depth = self.parallel_search.iterative_deepening(
+                board, deadline, simulation_type=BitboardSimulation, rules=rules
+            )
+        else:
+            best_direction, depth = search(board, deadline, rules)
+        self.calculation_depth = depth
+        print(f"Looked {self.calculation_depth} steps into future.")
         return best_direction
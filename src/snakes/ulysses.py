@@ -0,0 +1,39 @@
+import src.models as models
+from src.snakes.default import SearchServer
+from src.planning import mcts, simulation
+from src.planning.deadline import Deadline
+import config
+
+
+class Ulysses(SearchServer):
+    """Free for all snake. Searches with decoupled UCT until it runs out of time."""
+
+    def __init__(self, network_margin_ms: float = config.NETWORK_MARGIN_MS):
+        super().__init__(network_margin_ms)
+        # How many times the last search visited the root
+        self.iterations = 0
+
+    def handle_index(self):
+        return models.BattlesnakeInfo(
+            author="drzoid",
+            color="#5b3fd1",
+            head="evil",
+            tail="curled",
+            version="0.1.0",
+        )
+
+    def search_board(
+        self,
+        board: models.Board | simulation.ParsedBoard,
+        deadline: Deadline,
+        rules: simulation.Rules = simulation.Rules(),
+    ) -> models.Direction:
+        tree = mcts.Tree(board, rules=rules)
+        tree.search(deadline)
+        self.iterations = tree.root.visits
+        for report in tree.report():
+            print(
+                f"{report.direction.name}: {report.visits} visits,"
+                f" value {report.value:.3f}"
+            )
+        return tree.best_direction()
@@ -0,0 +1,183 @@
+import array
+import multiprocessing
+import queue
+import threading
+import traceback
+from typing import Callable, List, Tuple
+
+from src import models
+from src.planning import multi_max
+from src.planning.deadline import Deadline
+from src.planning.simulation import Rules, Simulation
+
+# How long past the search deadline to wait for a worker before giving up on
+# it, in ms.
+OVERRUN_MS = 20
+
+# Searches the board for the first snake until the deadline, playing by the
+# rules. Returns the best direction and how deep the search got.
+Search = Callable[[models.Board, Deadline, Rules], Tuple[models.Direction, int]]
+
+# (width, height, food, hazards, ((id, health, body), ...)), where food, hazards
+# and bodies are the bytes of an array of y * width + x cell indices.
+EncodedBoard = Tuple[int, int, bytes, bytes, Tuple[Tuple[str, int, bytes], ...]]
+
+
+def _encode_coords(coords, width: int) -> bytes:
+    return array.array("H", [c.y * width + c.x for c in coords]).tobytes()
+
+
+def _decode_coords(encoded: bytes, width: int):
+    cells = array.array("H")
+    cells.frombytes(encoded)
+    return [{"x": cell % width, "y": cell // width} for cell in cells]
+
+
+def encode_board(board: models.Board) -> EncodedBoard:
+    """Just enough of the board to search it, cheap to send to a worker."""
+    return (
+        board.width,
+        board.height,
+        _encode_coords(board.food, board.width),
+        _encode_coords(board.hazards, board.width),
+        tuple(
+            (snk.id, snk.health, _encode_coords(snk.body, board.width))
+            for snk in board.snakes
+        ),
+    )
+
+
+def decode_board(encoded: EncodedBoard) -> models.Board:
+    width, height, food, hazards, snakes = encoded
+    snakes_data = []
+    for snk_id, health, body in snakes:
+        body = _decode_coords(body, width)
+        snakes_data.append(
+            {
+                "id": snk_id,
+                "name": snk_id,
+                "health": health,
+                "body": body,
+                "latency": "",
+                "head": body[0],
+                "length": len(body),
+            }
+        )
+    return models.Board(
+        {
+            "width": width,
+            "height": height,
+            "food": _decode_coords(food, width),
+            "hazards": _decode_coords(hazards, width),
+            "snakes": snakes_data,
+        }
+    )
+
+
+def _serve(search: Search, connection):
+    """Main loop of a worker process.
+
+    Sends back the index of the direction in CARDINAL_FOUR and the depth, or
+    None if the search failed.
+    """
+    while True:
+        try:
+            encoded, rules, deadline_end = connection.recv()
+        except EOFError:
+            return
+        try:
+            direction, depth = search(
+                decode_board(encoded), Deadline.at(deadline_end), rules
+            )
+            connection.send((models.CARDINAL_FOUR.index(direction), depth))
+        except Exception:
+            traceback.print_exc()
+            connection.send(None)
+
+
+class _Worker:
+    def __init__(self, context, search: Search):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_serve, args=(search, child_connection), daemon=True
+        )
+        self.process.start()
+        child_connection.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class WorkerPool:
+    """Long lived worker processes that run a search for the request threads.
+
+    Each move is handed to an idle worker, so a slow game only ties up its own
+    worker and can't stall the moves of other games on the same server. A
+    worker that hasn't answered shortly after the deadline is killed and
+    replaced, and the move falls back to the first safe direction. Starting a
+    process is slow, so that happens on a thread of its own after the move has
+    been answered.
+
+    The workers are started when this is constructed, so it should be made
+    once when the server starts, and close() called when it stops.
+    """
+
+    def __init__(self, search: Search, num_workers: int, overrun_ms=OVERRUN_MS):
+        self.search_function = search
+        self.num_workers = num_workers
+        self.overrun_ms = overrun_ms
+        # How many workers were killed for not answering in time.
+        self.num_cancelled = 0
+        # Spawn rather than fork, the server is multi-threaded.
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        for _ in range(num_workers):
+            self._idle.put(_Worker(self._context, search))
+        # Threads replacing workers that overran
+        self._replacing: List[threading.Thread] = []
+        self._replacing_lock = threading.Lock()
+
+    def _replace(self, worker: _Worker):
+        worker.kill()
+        self._idle.put(_Worker(self._context, self.search_function))
+
+    def close(self):
+        with self._replacing_lock:
+            replacing = self._replacing
+            self._replacing = []
+        for thread in replacing:
+            thread.join()
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                return
+
+    def search(
+        self, board: models.Board, deadline: Deadline, rules: Rules = Rules()
+    ) -> Tuple[models.Direction, int]:
+        """Run the search in a worker. Safe to call from many threads."""
+        try:
+            worker = self._idle.get(timeout=max(0, deadline.remaining_ms()) / 1000)
+        except queue.Empty:
+            print("No idle worker, falling back.")
+            return multi_max.first_safe_direction(Simulation(board, max_depth=0)), 0
+
+        worker.connection.send((encode_board(board), rules, deadline.end))
+        wait_ms = max(0, deadline.remaining_ms()) + self.overrun_ms
+        if worker.connection.poll(wait_ms / 1000):
+            answer = worker.connection.recv()
+            self._idle.put(worker)
+            if answer is not None:
+                index, depth = answer
+                return models.CARDINAL_FOUR[index], depth
+        else:
+            self.num_cancelled += 1
+            thread = threading.Thread(target=self._replace, args=(worker,), daemon=True)
+            thread.start()
+            with self._replacing_lock:
+                self._replacing = [t for t in self._replacing if t.is_alive()]
+                self._replacing.append(thread)
+        return multi_max.first_safe_direction(Simulation(board, max_depth=0)), 0
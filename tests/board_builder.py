@@ -123,13 +123,15 @@ class BoardBuilder:
             snakes.append(snk)
         return snakes
 
+    def to_json(self) -> dict:
+        """The board as it appears in a request."""
+        return {
+            "width": len(self.grid),
+            "height": len(self.grid[0]),
+            "food": self.find_food(),
+            "snakes": self.find_snakes(),
+            "hazards": [],
+        }
+
     def to_board(self) -> models.Board:
-        return models.Board(
-            {
-                "width": len(self.grid),
-                "height": len(self.grid[0]),
-                "food": self.find_food(),
-                "snakes": self.find_snakes(),
-                "hazards": [],
-            }
-        )
+        return models.Board(self.to_json())
@@ -0,0 +1,127 @@
+import random
+import unittest
+
+import numpy as np
+
+import src.models as models
+from src.planning.batch_simulation import BatchSimulation
+from src.planning.simulation import FoodSpawns, Rules, Simulation
+from tests.board_builder import BoardBuilder
+
+
+class TestBatchSimulation(unittest.TestCase):
+    def setUp(self):
+        self.board = BoardBuilder(
+            """
+            v....vv
+            va<..Cv
+            >>^...d
+            .*.....
+            .....*.
+            ...>>b.
+            """,
+            {
+                "a": 51,
+                "b": 100,
+                "c": 2,
+                "d": 42,
+            },
+        ).to_board()
+
+    def assertSameGame(self, batch: BatchSimulation, game: int, sim: Simulation):
+        self.assertEqual(list(batch.health[game]), list(sim.healths))
+        self.assertEqual(set(batch.food_in(game)), set(sim.food))
+        for snk_id, body in enumerate(sim.bodies):
+            self.assertEqual(batch.body(game, snk_id), list(body))
+            self.assertEqual(batch.lengths[game, snk_id], len(body))
+
+    def test_init(self):
+        batch = BatchSimulation(self.board, batch_size=3)
+        sim = Simulation(self.board)
+        for game in range(3):
+            self.assertSameGame(batch, game, sim)
+
+    def test_random_games(self):
+        rng = random.Random(1234)
+        batch_size = 64
+        batch = BatchSimulation(self.board, batch_size=batch_size, max_depth=12)
+        sims = [Simulation(self.board, max_depth=12) for _ in range(batch_size)]
+        for _ in range(12):
+            moves = np.array(
+                [[rng.randrange(4) for _ in sims[0].snake_ids] for _ in sims]
+            )
+            for sim, joint_move in zip(sims, moves):
+                for snk_id in sim.snake_ids:
+                    if not sim.snake_is_dead(snk_id):
+                        sim.do_move(snk_id, models.CARDINAL_FOUR[joint_move[snk_id]])
+                sim.do_turn()
+            batch.step(moves)
+            for game, sim in enumerate(sims):
+                self.assertSameGame(batch, game, sim)
+
+    def test_all_joint_moves(self):
+        # Every combination of the four snakes' moves, in one step
+        joint_moves = np.array(np.meshgrid(*[range(4)] * 4)).reshape(4, -1).T
+        batch = BatchSimulation(self.board, batch_size=len(joint_moves))
+        batch.step(joint_moves)
+        for game in (0, 100, 255):
+            sim = Simulation(self.board)
+            for snk_id, move in enumerate(joint_moves[game]):
+                sim.do_move(snk_id, models.CARDINAL_FOUR[move])
+            sim.do_turn()
+            self.assertSameGame(batch, game, sim)
+
+    def test_all_joint_moves_with_hazards(self):
+        # Next to every head, with a food in a stacked hazard next to b.
+        self.board.hazards = [
+            models.Coord.from_x_y(x, y) for x in range(4) for y in range(3, 6)
+        ] + [models.Coord.from_x_y(x, y) for x, y in ((5, 1), (5, 1), (4, 0), (6, 2))]
+        rules = Rules(hazard_damage_per_turn=30)
+        joint_moves = np.array(np.meshgrid(*[range(4)] * 4)).reshape(4, -1).T
+        batch = BatchSimulation(self.board, batch_size=len(joint_moves), rules=rules)
+        batch.step(joint_moves)
+        for game, joint_move in enumerate(joint_moves):
+            sim = Simulation(self.board, rules=rules)
+            for snk_id, move in enumerate(joint_move):
+                sim.do_move(snk_id, models.CARDINAL_FOUR[move])
+            sim.do_turn()
+            self.assertSameGame(batch, game, sim)
+
+    def test_food_spawns(self):
+        joint_moves = np.array(np.meshgrid(*[range(4)] * 4)).reshape(4, -1).T
+        for spawns in (FoodSpawns.SAMPLED, FoodSpawns.EXPECTED):
+            for minimum_food in (0, 3):
+                with self.subTest(spawns=spawns, minimum_food=minimum_food):
+                    # One new food every turn, unless topping up to the minimum
+                    rules = Rules(
+                        minimum_food=minimum_food,
+                        food_spawn_chance=100,
+                        food_spawns=spawns,
+                    )
+                    batch = BatchSimulation(
+                        self.board, batch_size=len(joint_moves), rules=rules
+                    )
+                    batch.step(joint_moves)
+                    for game in (0, 100, 255):
+                        sim = Simulation(self.board)
+                        for snk_id, move in enumerate(joint_moves[game]):
+                            sim.do_move(snk_id, models.CARDINAL_FOUR[move])
+                        sim.do_turn()
+                        food = set(batch.food_in(game))
+                        self.assertTrue(set(sim.food) <= food)
+                        expected = len(list(sim.food)) + 1
+                        self.assertEqual(len(food), max(expected, minimum_food))
+                        for body in sim.bodies:
+                            self.assertFalse(food & set(body))
+                    # Each game places its own food.
+                    self.assertGreater(len({tuple(batch.food[g]) for g in range(3)}), 1)
+
+    def test_missing_move(self):
+        batch = BatchSimulation(self.board, batch_size=2)
+        with self.assertRaises(ValueError):
+            batch.step(np.array([[0, 0, 0, 0], [0, -1, 0, 0]]))
+
+    def test_max_depth(self):
+        batch = BatchSimulation(self.board, batch_size=1, max_depth=0)
+        with self.assertRaises(AssertionError):
+            batch.step(np.zeros((1, 4), dtype=int))
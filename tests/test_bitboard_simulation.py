@@ -0,0 +1,79 @@
+import random
+import unittest
+
+import src.models as models
+import src.planning.multi_max as multi_max
+from src.planning.bitboard_simulation import BitboardSimulation
+from src.planning.simulation import Simulation
+from tests import test_simulation
+from tests.board_builder import BoardBuilder
+
+
+class TestBitboardSimulation(test_simulation.TestSimulation):
+    SimulationType = BitboardSimulation
+
+
+class TestMatchesSimulation(unittest.TestCase):
+    def assertSameState(self, expected: Simulation, actual: Simulation):
+        self.assertEqual(actual.turn, expected.turn)
+        self.assertEqual(list(actual.healths), list(expected.healths))
+        self.assertEqual(
+            sorted((f.x, f.y) for f in actual.food),
+            sorted((f.x, f.y) for f in expected.food),
+        )
+        for expected_body, actual_body in zip(expected.bodies, actual.bodies):
+            self.assertEqual(list(actual_body), list(expected_body))
+        self.assertEqual(actual.render(), expected.render())
+
+    def test_random_games(self):
+        board = BoardBuilder(
+            """
+            v....vv
+            va<..Cv
+            >>^...d
+            .*.....
+            .....*.
+            ...>>b.
+            """,
+            {
+                "a": 51,
+                "b": 100,
+                "c": 2,
+                "d": 42,
+            },
+        ).to_board()
+        rng = random.Random(1234)
+        for _ in range(50):
+            expected = Simulation(board, max_depth=12)
+            actual = BitboardSimulation(board, max_depth=12)
+            for _ in range(12):
+                for snk_id in expected.snake_ids:
+                    d = rng.choice(models.CARDINAL_FOUR)
+                    expected.do_move(snk_id, d)
+                    actual.do_move(snk_id, d)
+                expected.do_turn()
+                actual.do_turn()
+                self.assertSameState(expected, actual)
+            while expected.turn > 0:
+                expected.undo_turn()
+                actual.undo_turn()
+                self.assertSameState(expected, actual)
+
+    def test_multi_max_same_decision(self):
+        board = BoardBuilder(
+            """
+            .........
+            .>>a.....
+            .>b......
+            """,
+            {
+                "a": 100,
+                "b": 100,
+            },
+        ).to_board()
+        self.assertEqual(
+            multi_max.ideal_direction(
+                board, depth=3, simulation_type=BitboardSimulation
+            ),
+            multi_max.ideal_direction(board, depth=3),
+        )
@@ -0,0 +1,73 @@
+import copy
+import unittest
+
+import src.models as models
+from src.planning import cells
+from src.planning.simulation import Simulation
+from tests.board_builder import BoardBuilder
+
+
+class TestCoord(unittest.TestCase):
+    def test_hashable(self):
+        a = models.Coord.from_x_y(1, 2)
+        b = models.Coord.from_x_y(1, 2)
+        self.assertEqual(len({a, b}), 1)
+        self.assertIn(b, {a: None})
+
+    def test_copies_are_shared(self):
+        a = models.Coord.from_x_y(1, 2)
+        self.assertIs(copy.copy(a), a)
+        self.assertIs(copy.deepcopy(a), a)
+
+
+class TestCellTable(unittest.TestCase):
+    def test_at(self):
+        table = cells.CellTable(3, 2)
+        self.assertEqual(table.at(2, 1), models.Coord.from_x_y(2, 1))
+        self.assertIs(table.at(2, 1), table.at(2, 1))
+        self.assertIs(table.intern(models.Coord.from_x_y(2, 1)), table.at(2, 1))
+        # One cell past the edge is still in the table
+        self.assertEqual(table.at(-1, 2), models.Coord.from_x_y(-1, 2))
+        self.assertFalse(table.on_board[table.index(table.at(-1, 2))])
+        self.assertTrue(table.on_board[table.index(table.at(0, 0))])
+
+    def test_step(self):
+        table = cells.CellTable(3, 2)
+        self.assertIs(table.step(table.at(1, 0), models.UP), table.at(1, 1))
+        self.assertIs(table.step(table.at(1, 0), models.DOWN), table.at(1, -1))
+        self.assertIs(table.step(table.at(0, 0), models.LEFT), table.at(-1, 0))
+        self.assertIs(table.step(table.at(2, 1), models.RIGHT), table.at(3, 1))
+
+    def test_neighbors(self):
+        table = cells.CellTable(3, 2)
+        self.assertEqual(
+            table.neighbors[table.index(table.at(0, 0))],
+            [table.at(0, 1), table.at(1, 0)],
+        )
+        self.assertEqual(
+            table.neighbors[table.index(table.at(1, 0))],
+            [table.at(1, 1), table.at(0, 0), table.at(2, 0)],
+        )
+        self.assertEqual(table.neighbors[table.index(table.at(-1, 0))], [])
+
+    def test_shared_between_simulations(self):
+        self.assertIs(cells.cells_for(7, 5), cells.cells_for(7, 5))
+
+    def test_simulation_uses_table(self):
+        sim = Simulation(
+            BoardBuilder(
+                """
+                ..*..
+                .>a..
+                .....
+                """,
+                {"a": 100},
+            ).to_board(),
+            max_depth=1,
+        )
+        table = cells.cells_for(5, 3)
+        sim.do_move(0, models.UP)
+        sim.do_turn()
+        for segment in sim.bodies[0]:
+            self.assertIs(segment, table.intern(segment))
+        self.assertEqual(len(sim.bodies[0]), 3)
@@ -0,0 +1,55 @@
+import time
+import unittest
+
+from src.planning.deadline import Deadline, deepen
+
+
+class TestDeadline(unittest.TestCase):
+    def test_not_expired(self):
+        deadline = Deadline(1000)
+        self.assertFalse(deadline.expired())
+        self.assertGreater(deadline.remaining_ms(), 900)
+        deadline.check()
+
+    def test_expired(self):
+        deadline = Deadline(1)
+        time.sleep(0.002)
+        self.assertTrue(deadline.expired())
+        self.assertLess(deadline.remaining_ms(), 0)
+        with self.assertRaises(TimeoutError):
+            deadline.check()
+
+    def test_at(self):
+        deadline = Deadline.at(time.monotonic() + 1)
+        self.assertFalse(deadline.expired())
+        self.assertTrue(Deadline.at(time.monotonic()).expired())
+
+
+class TestDeepen(unittest.TestCase):
+    def test_no_deadline(self):
+        self.assertEqual(
+            list(deepen(None, range(1, 4), lambda depth: depth * 10)),
+            [(1, 10), (2, 20), (3, 30)],
+        )
+
+    def test_stops_on_timeout(self):
+        def search(depth: int) -> int:
+            if depth == 3:
+                raise TimeoutError()
+            return depth
+
+        self.assertEqual(
+            list(deepen(Deadline(1000), range(1, 6), search)), [(1, 1), (2, 2)]
+        )
+
+    def test_skips_depth_that_cant_finish(self):
+        searched = []
+
+        def search(depth: int) -> int:
+            searched.append(depth)
+            # Takes 30ms of the 50ms deadline, so there's no time for another
+            time.sleep(0.03)
+            return depth
+
+        self.assertEqual(list(deepen(Deadline(50), range(1, 6), search)), [(1, 1)])
+        self.assertEqual(searched, [1])
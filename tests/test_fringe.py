@@ -1,8 +1,11 @@
+import itertools
+import threading
 import unittest
 from typing import Iterable
 import time
 
-from src.planning.fringe import TimedBFS, ChildGenerator, BoardState
+import src.models as models
+from src.planning.fringe import TimedBFS, ChildGenerator, BoardState, DeltaBoardState
 from src.planning.simulation import Simulation
 from tests.board_builder import BoardBuilder
 
@@ -35,6 +38,25 @@ def make_root(depth=10, delay_ms=1, branching=1):
     return ChildGeneratorFake(depth, delay_ms, branching)
 
 
+def count_nodes(sim: Simulation) -> int:
+    """Number of board states in the full tree below sim."""
+    if sim.turn == sim.max_depth:
+        return 1
+    options = [
+        [None] if sim.snake_is_dead(snk_id) else models.CARDINAL_FOUR
+        for snk_id in sim.snake_ids
+    ]
+    count = 1
+    for joint_move in itertools.product(*options):
+        for snk_id, d in enumerate(joint_move):
+            if d is not None:
+                sim.do_move(snk_id, d)
+        sim.do_turn()
+        count += count_nodes(sim)
+        sim.undo_turn()
+    return count
+
+
 class TestFringe(unittest.TestCase):
     def test_bfs_basic(self):
         root = make_root(depth=3)
@@ -50,6 +72,71 @@ class TestFringe(unittest.TestCase):
         bfs.run()
         self.assertSequenceEqual(root.order_explored, [0, 1, 2, 3, 4, 5, 6])
 
+    def test_bfs_time_limit(self):
+        root = make_root(depth=1000, delay_ms=1, branching=2)
+
+        bfs = TimedBFS(root, 50)
+        start = time.monotonic()
+        bfs.run()
+        elapsed_ms = (time.monotonic() - start) * 1000
+        self.assertGreater(bfs.num_expanded, 0)
+        self.assertGreater(len(bfs.q), 0)
+        # Only one child can be generated after the deadline.
+        self.assertLess(elapsed_ms, 50 + 10)
+
+    def test_bfs_in_thread(self):
+        root = make_root(depth=1000, delay_ms=1, branching=2)
+        bfs = TimedBFS(root, 50)
+        errors = []
+
+        def run():
+            try:
+                bfs.run()
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join(timeout=1)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(errors, [])
+        self.assertGreater(bfs.num_expanded, 0)
+
+    def test_bfs_stats(self):
+        root = make_root(depth=3, branching=2)
+
+        bfs = TimedBFS(root, 500)
+        bfs.run()
+        stats = bfs.stats()
+        self.assertEqual(stats["num_expanded"], 7)
+        self.assertEqual(stats["frontier_size"], 0)
+        self.assertEqual(stats["peak_frontier_size"], 4)
+        self.assertEqual(stats["num_dropped"], 0)
+        self.assertGreater(stats["elapsed_ms"], 0)
+        self.assertGreater(stats["expanded_per_second"], 0)
+
+    def test_bfs_max_frontier(self):
+        frontier_sizes = []
+
+        class Wide(ChildGenerator):
+            def __init__(self, depth):
+                self.depth = depth
+
+            def children(self) -> Iterable[ChildGenerator]:
+                frontier_sizes.append(len(bfs.q))
+                if self.depth == 0:
+                    return
+                for _ in range(3):
+                    yield Wide(self.depth - 1)
+
+        bfs = TimedBFS(Wide(4), 500, max_frontier=5)
+        bfs.run()
+        self.assertLessEqual(max(frontier_sizes), 5)
+        self.assertGreater(bfs.num_dropped, 0)
+        # Everything that was kept got expanded.
+        self.assertEqual(len(bfs.q), 0)
+        self.assertEqual(bfs.num_expanded, len(frontier_sizes))
+
     def test_snake_decisions(self):
         board = BoardBuilder(
             """
@@ -76,3 +163,52 @@ class TestFringe(unittest.TestCase):
         print(f"Took {(end-start)*1000}ms")
         print(f"We expanded {bfs.num_expanded}")
         print(f"There are {len(bfs.q)} elements in the queue.")
+        stats = bfs.stats()
+        self.assertGreaterEqual(stats["peak_frontier_size"], stats["frontier_size"])
+
+    def test_delta_board_state_matches_board_state(self):
+        board = BoardBuilder(
+            """
+            v....vv
+            va<..Cv
+            >>^...d
+            .*.....
+            .....*.
+            ...>>b.
+            """,
+            {
+                "a": 51,
+                "b": 100,
+                "c": 1,
+                "d": 42,
+            },
+        ).to_board()
+        copied = [
+            child.sim.zobrist_hash
+            for child in BoardState(Simulation(board, max_depth=2)).children()
+        ]
+        delta_root = DeltaBoardState.root(Simulation(board, max_depth=2))
+        delta = [
+            child.shared.goto(child.moves).zobrist_hash
+            for child in list(delta_root.children())
+        ]
+        self.assertSequenceEqual(delta, copied)
+
+    def test_delta_board_state_bfs(self):
+        board = BoardBuilder(
+            """
+            .....
+            .>a..
+            .....
+            ..>b.
+            """,
+            {
+                "a": 100,
+                "b": 100,
+            },
+        ).to_board()
+        root = DeltaBoardState.root(Simulation(board, max_depth=2))
+        bfs = TimedBFS(root, 1000)
+        bfs.run()
+        self.assertEqual(len(bfs.q), 0)
+        self.assertEqual(bfs.num_expanded, count_nodes(Simulation(board, max_depth=2)))
@@ -0,0 +1,74 @@
+import unittest
+
+import src.models as models
+from src.planning import mcts, simulation
+from src.planning.deadline import Deadline
+from tests.board_builder import BoardBuilder
+
+
+class TestMcts(unittest.TestCase):
+    def setUp(self):
+        # Going down runs into b, which is too long to get out of the way
+        self.board = BoardBuilder(
+            """
+            .....
+            .....
+            .a<..
+            >>>b.
+            """,
+            {"a": 100, "b": 100},
+        ).to_board()
+
+    def test_avoids_body(self):
+        tree = mcts.Tree(self.board, seed=1)
+        tree.search(Deadline(1000), max_iterations=300)
+        self.assertIsNot(tree.best_direction(), models.DOWN)
+        # Neither back onto the neck nor into b's body is tried at all
+        reports = {r.direction.name: r for r in tree.report()}
+        self.assertEqual(sorted(reports), ["left", "up"])
+
+    def test_visits_add_up(self):
+        tree = mcts.Tree(self.board, seed=2)
+        tree.search(Deadline(1000), max_iterations=100)
+        self.assertEqual(tree.root.visits, 100)
+        self.assertEqual(sum(r.visits for r in tree.report()), 100)
+
+    def test_tree_is_reused(self):
+        tree = mcts.Tree(self.board, seed=3)
+        tree.search(Deadline(1000), max_iterations=50)
+        children = dict(tree.root.children)
+        tree.search(Deadline(1000), max_iterations=50)
+        self.assertEqual(tree.root.visits, 100)
+        for joint_move, child in children.items():
+            self.assertIs(tree.root.children[joint_move], child)
+
+    def test_sim_returns_to_root(self):
+        tree = mcts.Tree(self.board, seed=4)
+        before = tree.sim.render()
+        tree.search(Deadline(1000), max_iterations=50)
+        self.assertEqual(tree.sim.turn, 0)
+        self.assertEqual(tree.sim.render(), before)
+
+    def test_respects_deadline(self):
+        tree = mcts.Tree(self.board, seed=5)
+        deadline = Deadline(50)
+        tree.search(deadline)
+        self.assertTrue(deadline.expired())
+        self.assertLess(deadline.remaining_ms(), 0)
+        self.assertGreater(deadline.remaining_ms(), -50)
+
+    def test_food_is_sampled(self):
+        tree = mcts.Tree(self.board, seed=6)
+        self.assertIs(tree.sim.rules.food_spawns, simulation.FoodSpawns.SAMPLED)
+        # The seed comes from the tree's seed.
+        self.assertEqual(
+            tree.sim.rules.seed, mcts.Tree(self.board, seed=6).sim.rules.seed
+        )
+        self.assertNotEqual(
+            tree.sim.rules.seed, mcts.Tree(self.board, seed=7).sim.rules.seed
+        )
+        # There's no food, so the minimum is topped up after the first turn.
+        tree.sim.do_move(0, models.UP)
+        tree.sim.do_move(1, models.RIGHT)
+        tree.sim.do_turn()
+        self.assertEqual(len(tree.sim.food), 1)
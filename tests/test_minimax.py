@@ -4,6 +4,7 @@ from absl.testing import parameterized
 
 import src.models as models
 from src.planning import minimax
+from src.planning.deadline import Deadline
 from src.planning.simulation import Simulation
 from tests.board_builder import BoardBuilder
 
@@ -51,4 +52,168 @@ class TestMinimax(parameterized.TestCase):
         self, board_str: str, healths: dict[str, int], expected_value: int
     ):
         sim = Simulation(board=BoardBuilder(board_str, healths).to_board())
-        self.assertEqual(minimax.evaluate(sim), expected_value)
\ No newline at end of file
+        self.assertEqual(minimax.evaluate(sim), expected_value)
+
+
+def full_minimax(sim: Simulation, depth: int) -> int:
+    """Minimax without any pruning, to check alpha_beta against."""
+    if depth <= 0 or sim.snake_is_dead(0) or sim.snake_is_dead(1):
+        return minimax.evaluate(sim)
+    best_value = None
+    for my_move in minimax.candidate_moves(sim, 0):
+        sim.do_move(0, my_move)
+        worst_value = None
+        for their_move in minimax.candidate_moves(sim, 1):
+            sim.do_move(1, their_move)
+            sim.do_turn()
+            value = full_minimax(sim, depth - 1)
+            sim.undo_turn()
+            sim.undo_move(1)
+            if worst_value is None or value < worst_value:
+                worst_value = value
+        sim.undo_move(0)
+        if best_value is None or worst_value > best_value:
+            best_value = worst_value
+    return best_value
+
+
+class TestAlphaBeta(parameterized.TestCase):
+    @parameterized.named_parameters(
+        dict(
+            testcase_name="open",
+            board_str="""
+                ......
+                .>>a..
+                ......
+                ..*...
+                ...b<.
+                ......
+            """,
+        ),
+        dict(
+            testcase_name="cramped",
+            board_str="""
+                >>>v.
+                .a<<.
+                ..>>b
+            """,
+        ),
+        dict(
+            testcase_name="head_to_head",
+            board_str="""
+                .>>a.b<<.
+            """,
+        ),
+    )
+    def test_matches_full_minimax(self, board_str: str):
+        board = BoardBuilder(board_str, {"a": 100, "b": 100}).to_board()
+        for depth in range(1, 5):
+            sim = Simulation(board, max_depth=depth)
+            self.assertEqual(
+                minimax.alpha_beta(
+                    sim, depth, minimax.MIN_VALUE - 1, minimax.MAX_VALUE + 1
+                ),
+                full_minimax(sim, depth),
+                f"Pruning changed the value at depth {depth}.",
+            )
+
+    @parameterized.named_parameters(
+        dict(testcase_name="open", depth=6),
+        dict(testcase_name="shallow", depth=2),
+    )
+    def test_first_move_keeps_value(self, depth: int):
+        board = BoardBuilder(
+            """
+            ......
+            .>>a..
+            ......
+            ..*...
+            ...b<.
+            ......
+            """,
+            {"a": 100, "b": 100},
+        ).to_board()
+        sim = Simulation(board, max_depth=depth)
+        expected = full_minimax(sim, depth)
+        for first in models.CARDINAL_FOUR:
+            self.assertEqual(minimax._search_root(sim, depth, first)[0], expected)
+
+    def test_avoid_wall(self):
+        board = BoardBuilder(
+            """
+            >>>a....
+            ........
+            ....b<<<
+            """,
+            {"a": 100, "b": 100},
+        ).to_board()
+        self.assertIn(
+            minimax.ideal_direction(board, depth=6), (models.RIGHT, models.DOWN)
+        )
+
+    def test_simple_kill(self):
+        board = BoardBuilder(
+            """
+            .........
+            .>>a.....
+            .>b......
+            """,
+            {"a": 100, "b": 100},
+        ).to_board()
+        self.assertEqual(minimax.ideal_direction(board, depth=3), models.DOWN)
+
+    def test_avoid_losing_head_to_head(self):
+        board = BoardBuilder(
+            """
+            .v<<...
+            .b.....
+            .......
+            .a.....
+            .^.....
+            """,
+            {"a": 100, "b": 100},
+        ).to_board()
+        self.assertNotEqual(minimax.ideal_direction(board, depth=4), models.UP)
+
+    def test_iterative_deepening_simple_kill(self):
+        board = BoardBuilder(
+            """
+            .........
+            .>>a.....
+            .>b......
+            """,
+            {"a": 100, "b": 100},
+        ).to_board()
+        direction, depth = minimax.iterative_deepening(
+            board, Deadline(1000), max_depth=6
+        )
+        self.assertEqual(direction, models.DOWN)
+        # The kill is found at depth one, nothing deeper can beat it.
+        self.assertEqual(depth, 1)
+
+    def test_iterative_deepening_respects_deadline(self):
+        board = BoardBuilder(
+            """
+            ...........
+            .>>>>a.....
+            ...........
+            ......*....
+            ...........
+            ....b<<<...
+            ...........
+            """,
+            {"a": 80, "b": 90},
+        ).to_board()
+        deadline = Deadline(50)
+        direction, depth = minimax.iterative_deepening(
+            board, deadline, max_depth=40, simulation_type=Simulation
+        )
+        self.assertIn(direction, models.CARDINAL_FOUR)
+        self.assertGreater(depth, 0)
+        self.assertLess(depth, 40)
+        self.assertGreater(deadline.remaining_ms(), -50)
+
+    def test_requires_two_snakes(self):
+        board = BoardBuilder(">>a..", {"a": 100}).to_board()
+        with self.assertRaises(ValueError):
+            minimax.ideal_direction(board, depth=2)
@@ -0,0 +1,80 @@
+import unittest
+
+import src.models as models
+from tests.board_builder import BoardBuilder
+
+
+class TestBoard(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = BoardBuilder(
+            """
+            ..*.
+            .a<.
+            ....
+            """,
+            {"a": 100},
+        ).to_board()
+        self.board.hazards = [models.Coord.from_x_y(3, 0)]
+
+    def test_grid_is_lazy(self):
+        self.assertIsNone(self.board._tiles)
+        self.board.get(0, 0)
+        self.assertIsNotNone(self.board._tiles)
+
+    def test_grid(self):
+        grid = self.board.grid
+        self.assertEqual(len(grid), 4)
+        self.assertEqual(len(grid[0]), 3)
+        self.assertEqual(grid[2][2], models.Tile.FOOD)
+        self.assertEqual(grid[1][1], models.Tile.SNAKE)
+        self.assertEqual(grid[2][1], models.Tile.SNAKE)
+        self.assertEqual(grid[3][0], models.Tile.HAZARD)
+        self.assertEqual(grid[0][0], models.Tile.EMPTY)
+        with self.assertRaises(IndexError):
+            grid[4]
+        with self.assertRaises(IndexError):
+            grid[0][3]
+
+    def test_get(self):
+        for x in range(self.board.width):
+            for y in range(self.board.height):
+                self.assertEqual(self.board.get(x, y), self.board.grid[x][y])
+        self.assertEqual(self.board.get(-1, 0), models.Tile.OUTSIDE)
+        self.assertEqual(self.board.get(0, 3), models.Tile.OUTSIDE)
+
+    def test_can_move(self):
+        snk = self.board.snakes[0]
+        self.assertTrue(self.board.can_move(snk, models.UP))
+        self.assertTrue(self.board.can_move(snk, models.LEFT))
+        # The tail will have moved out of the way
+        self.assertTrue(self.board.can_move(snk, models.RIGHT))
+        self.assertTrue(self.board.can_safe_move(snk, models.DOWN))
+        self.assertFalse(self.board.can_safe_move(snk, models.RIGHT))
+
+
+class TestRuleset(unittest.TestCase):
+    def test_settings(self):
+        ruleset = models.Ruleset(
+            {
+                "name": "royale",
+                "version": "v1.2.3",
+                "settings": {
+                    "foodSpawnChance": 25,
+                    "minimumFood": 2,
+                    "hazardDamagePerTurn": 20,
+                    "royale": {"shrinkEveryNTurns": 10},
+                },
+            }
+        )
+        self.assertEqual(ruleset.settings.food_spawn_chance, 25)
+        self.assertEqual(ruleset.settings.minimum_food, 2)
+        self.assertEqual(ruleset.settings.hazard_damage_per_turn, 20)
+        self.assertEqual(ruleset.settings.shrink_every_n_turns, 10)
+
+    def test_default_settings(self):
+        ruleset = models.Ruleset({"name": "standard", "version": "v1.2.3"})
+        self.assertEqual(ruleset.settings.food_spawn_chance, 15)
+        self.assertEqual(ruleset.settings.minimum_food, 1)
+        self.assertEqual(ruleset.settings.hazard_damage_per_turn, 14)
+        self.assertEqual(ruleset.settings.shrink_every_n_turns, 0)
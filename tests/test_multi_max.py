@@ -1,8 +1,11 @@
+import time
 import unittest
 
 import src.models as models
 import src.planning.multi_max as multi_max
+from src.planning.deadline import Deadline
 from src.planning.simulation import Simulation
+from src.planning.transposition import TranspositionTable
 from tests.board_builder import BoardBuilder
 
 
@@ -78,6 +81,61 @@ class TestMultiMax(unittest.TestCase):
             bin(res3.evaluate_for(1)), bin(multi_max.pack_to_bits(2, 0, 3, 47))
         )
 
+    def test_evaluate_matches_result(self):
+        sim = Simulation(
+            board=BoardBuilder(
+                """
+            .v...
+            .>b..
+            ...av
+            ...^<
+            """,
+                {
+                    "a": 50,
+                    "b": 2,
+                },
+            ).to_board()
+        )
+        # b loses a head-to-head with a, then a runs off the board
+        for _ in range(3):
+            sim.do_move(0, models.UP)
+            if not sim.snake_is_dead(1):
+                sim.do_move(1, models.RIGHT)
+            sim.do_turn()
+            res = multi_max.Result(sim)
+            scores = multi_max.evaluate(sim)
+            self.assertEqual(scores, [res.evaluate_for(snk_id) for snk_id in (0, 1)])
+            self.assertEqual(multi_max.Result.from_scores(scores), res)
+            self.assertEqual(
+                multi_max.Result.from_scores(scores).turns_alive, res.turns_alive
+            )
+        self.assertEqual(res.turns_alive, {0: 2, 1: 0})
+        self.assertEqual(res.num_dead, 2)
+
+    def test_evaluate_territory_matches_result(self):
+        sim = Simulation(
+            board=BoardBuilder(
+                """
+            .....
+            .>a..
+            ...b.
+            ...^.
+            """,
+                {
+                    "a": 50,
+                    "b": 20,
+                },
+            ).to_board()
+        )
+        res = multi_max.TerritoryResult(sim)
+        scores = multi_max.evaluate_territory(sim)
+        self.assertEqual(scores, [res.evaluate_for(snk_id) for snk_id in (0, 1)])
+        self.assertEqual(multi_max.TerritoryResult.from_scores(scores), res)
+        self.assertGreater(res.territory[0], 0)
+        self.assertGreater(res.territory[1], 0)
+        # Territory only comes after staying alive and killing.
+        self.assertEqual(scores[0] >> 24, multi_max.evaluate(sim)[0] >> 16)
+
 
 class TestSituations(unittest.TestCase):
     def test_hallway(self):
@@ -142,3 +200,146 @@ class TestSituations(unittest.TestCase):
         ).to_board()
         best_dir = multi_max.ideal_direction(board, depth=3)
         self.assertEqual(best_dir, models.DOWN, "Snake should move DOWN to kill.")
+
+    def test_avoid_dead_end(self):
+        """Territory scoring sees a dead end before the search reaches it."""
+        board = BoardBuilder(
+            # Going up leads into a dead end behind c's dead body, which is
+            # only a death four turns in.
+            """
+            .>c...
+            .^....
+            .^....
+            a<<<..
+            ......
+            """,
+            {
+                "a": 100,
+                "c": 0,
+            },
+        ).to_board()
+        self.assertEqual(multi_max.ideal_direction(board, depth=1), models.UP)
+        best_dir = multi_max.ideal_direction(
+            board, depth=1, decision_type=multi_max.TerritorySnakeDecision
+        )
+        self.assertEqual(best_dir, models.DOWN, "Snake should stay in the open.")
+
+    def test_trapped_opponent(self):
+        """b has nowhere to go, but a's moves still aren't all the same."""
+        board = BoardBuilder(
+            """
+            ...a..
+            ...^..
+            ...^..
+            >>>^..
+            ^<<...
+            b<<...
+            """,
+            {
+                "a": 100,
+                "b": 100,
+            },
+        ).to_board()
+        for depth in range(1, 4):
+            with self.subTest(depth=depth):
+                self.assertEqual(
+                    multi_max.ideal_direction(board, depth=depth), models.LEFT
+                )
+        direction, _ = multi_max.iterative_deepening(board, Deadline(200), max_depth=4)
+        self.assertEqual(direction, models.LEFT)
+
+
+class TestIterativeDeepening(unittest.TestCase):
+    def test_expired_deadline_raises(self):
+        board = BoardBuilder(
+            """
+            >>>a....
+            """,
+            {
+                "a": 100,
+            },
+        ).to_board()
+        sim = Simulation(board, max_depth=4)
+        with self.assertRaises(TimeoutError):
+            multi_max.SnakeDecision.make_tree(sim, 4, deadline=Deadline(0))
+
+    def test_finishes_small_search(self):
+        """A lone snake in a hallway is cheap to search all the way down."""
+        board = BoardBuilder(
+            """
+            >>>a....
+            """,
+            {
+                "a": 100,
+            },
+        ).to_board()
+        best_dir, depth = multi_max.iterative_deepening(
+            board, Deadline(1000), max_depth=6
+        )
+        self.assertEqual(best_dir, models.RIGHT)
+        self.assertEqual(depth, 6)
+
+    def test_stops_at_deadline(self):
+        board = BoardBuilder(
+            """
+            .........
+            .>>a.....
+            .........
+            .........
+            .>b......
+            """,
+            {
+                "a": 100,
+                "b": 100,
+            },
+        ).to_board()
+        start = time.monotonic()
+        best_dir, depth = multi_max.iterative_deepening(board, Deadline(50))
+        elapsed_ms = (time.monotonic() - start) * 1000
+        self.assertLess(elapsed_ms, 100)
+        self.assertGreaterEqual(depth, 1)
+        self.assertIn(best_dir, models.CARDINAL_FOUR)
+
+    def test_no_time_falls_back_to_safe_move(self):
+        board = BoardBuilder(
+            """
+            >>>a....
+            """,
+            {
+                "a": 100,
+            },
+        ).to_board()
+        best_dir, depth = multi_max.iterative_deepening(board, Deadline(0))
+        self.assertEqual(depth, 0)
+        self.assertEqual(best_dir, models.RIGHT)
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_same_result_with_table(self):
+        board = BoardBuilder(
+            """
+            ......
+            .>a...
+            ......
+            ...*..
+            ...b<.
+            ......
+            """,
+            {
+                "a": 100,
+                "b": 100,
+            },
+        ).to_board()
+        root = multi_max.SnakeDecision.make_tree(Simulation(board), 4)
+        table = TranspositionTable()
+        cached_root = multi_max.SnakeDecision.make_tree(
+            Simulation(board), 4, table=table
+        )
+        self.assertGreater(table.hits, 0, "Short snakes should transpose.")
+        self.assertEqual(cached_root.get_best_direction(), root.get_best_direction())
+        self.assertEqual(cached_root.get_result(), root.get_result())
+        for snk_id in (0, 1):
+            self.assertEqual(
+                cached_root.node_evaluate_for(snk_id),
+                root.node_evaluate_for(snk_id),
+            )
@@ -0,0 +1,166 @@
+import unittest
+
+import src.models as models
+import src.planning.multi_max as multi_max
+from src.planning import parallel
+from src.planning.bitboard_simulation import BitboardSimulation
+from src.planning.deadline import Deadline
+from src.planning.parallel import ParallelSearch
+from src.planning.simulation import Simulation
+from tests.board_builder import BoardBuilder
+
+
+def trapped_board() -> models.Board:
+    """b is boxed in by a's body. a can go left or right, left is safer."""
+    return BoardBuilder(
+        """
+        ...a..
+        ...^..
+        ...^..
+        >>>^..
+        ^<<...
+        b<<...
+        """,
+        {
+            "a": 100,
+            "b": 100,
+        },
+    ).to_board()
+
+
+class TestFirstJointMoves(unittest.TestCase):
+    def test_skips_obvious_deaths_and_dead_snakes(self):
+        sim = Simulation(
+            BoardBuilder(
+                """
+                a<.
+                ...
+                >b.
+                """,
+                {
+                    "a": 100,
+                    "b": 0,
+                },
+            ).to_board()
+        )
+        self.assertEqual(
+            parallel.first_joint_moves(sim),
+            [(models.CARDINAL_FOUR.index(models.DOWN), None)],
+        )
+
+    def test_trapped_snake_still_moves(self):
+        # Every move is an obvious death for b, it still has to make one.
+        sim = Simulation(trapped_board())
+        self.assertEqual(
+            parallel.first_joint_moves(sim),
+            [(models.CARDINAL_FOUR.index(d), 0) for d in (models.LEFT, models.RIGHT)],
+        )
+
+
+class TestParallelSearch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.search = ParallelSearch(num_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.search.close()
+
+    def test_matches_multi_max(self):
+        boards = [
+            BoardBuilder(
+                """
+                .........
+                .>>a.....
+                .>b......
+                """,
+                {
+                    "a": 100,
+                    "b": 100,
+                },
+            ).to_board(),
+            BoardBuilder(
+                """
+                ......
+                .a<<..
+                ..*...
+                ..b...
+                ..^<c.
+                ....^.
+                """,
+                {
+                    "a": 100,
+                    "b": 3,
+                    "c": 100,
+                },
+            ).to_board(),
+        ]
+        for board in boards:
+            for depth in range(1, 4):
+                with self.subTest(depth=depth):
+                    self.assertEqual(
+                        self.search.ideal_direction(board, depth=depth),
+                        multi_max.ideal_direction(board, depth=depth),
+                    )
+
+    def test_merged_result_matches_tree(self):
+        board = BoardBuilder(
+            """
+            .......
+            .>>a...
+            .......
+            ...b<<.
+            """,
+            {
+                "a": 100,
+                "b": 100,
+            },
+        ).to_board()
+        sim = Simulation(board, max_depth=2)
+        results = self.search._search(board, [2], None, Simulation)[0][0]
+        root = multi_max.SnakeDecision.make_tree(sim, 2)
+        result, direction = parallel.merge(sim, results)
+        self.assertEqual(result, root.get_result())
+        self.assertEqual(direction, root.get_best_direction())
+
+    def test_iterative_deepening(self):
+        board = BoardBuilder(
+            """
+            .........
+            .>>a.....
+            .>b......
+            """,
+            {
+                "a": 100,
+                "b": 100,
+            },
+        ).to_board()
+        direction, depth = self.search.iterative_deepening(
+            board, Deadline(500), max_depth=3, simulation_type=BitboardSimulation
+        )
+        self.assertEqual(depth, 3)
+        self.assertEqual(direction, multi_max.ideal_direction(board, depth=3))
+
+    def test_iterative_deepening_out_of_time(self):
+        board = BoardBuilder(
+            """
+            a<.
+            ...
+            >b.
+            """,
+            {
+                "a": 100,
+                "b": 100,
+            },
+        ).to_board()
+        direction, depth = self.search.iterative_deepening(board, Deadline(0))
+        self.assertEqual(depth, 0)
+        self.assertEqual(direction, models.DOWN)
+
+    def test_trapped_opponent(self):
+        board = trapped_board()
+        self.assertEqual(self.search.ideal_direction(board, depth=2), models.LEFT)
+        direction, depth = self.search.iterative_deepening(
+            board, Deadline(500), max_depth=3
+        )
+        self.assertEqual((direction, depth), (models.LEFT, 3))
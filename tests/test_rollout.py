@@ -0,0 +1,74 @@
+import time
+import unittest
+
+import numpy as np
+
+import src.models as models
+from src.planning import rollout
+from src.planning.batch_simulation import BatchSimulation
+from src.planning.deadline import Deadline
+from tests.board_builder import BoardBuilder
+
+
+class TestRollout(unittest.TestCase):
+    def test_random_safe_moves(self):
+        # b is in the corner with a body to its left, so it can only go up
+        board = BoardBuilder(
+            """
+            ...v.
+            .>>a.
+            .^<<b
+            """,
+            {"a": 50, "b": 50},
+        ).to_board()
+        batch = BatchSimulation(board, batch_size=20)
+        moves = rollout.random_safe_moves(batch, np.random.default_rng(0))
+        self.assertEqual(moves.shape, (20, 2))
+        self.assertTrue(np.all(moves[:, 1] == models.CARDINAL_FOUR.index(models.UP)))
+
+    def test_avoids_body(self):
+        # Going down runs into b, which is too long to get out of the way
+        board = BoardBuilder(
+            """
+            .....
+            .a<..
+            >>>b.
+            """,
+            {"a": 100, "b": 100},
+        ).to_board()
+        direction, stats = rollout.ideal_direction(
+            board, Deadline(50), depth=8, playouts_per_round=32, seed=1
+        )
+        self.assertIsNot(direction, models.DOWN)
+        # Neither back onto the neck nor into b's body is tried at all
+        self.assertEqual(sorted(s.direction.name for s in stats), ["left", "up"])
+
+    def test_stats(self):
+        stats = rollout.DirectionStats(models.UP)
+        stats.add(np.array([3, 5]), np.array([False, True]), np.array([4, 6]))
+        self.assertEqual(stats.playouts, 2)
+        self.assertEqual(stats.survival_rate, 0.5)
+        self.assertEqual(stats.mean_turns_alive, 4)
+        self.assertEqual(stats.mean_length, 5)
+
+    def test_respects_deadline(self):
+        board = BoardBuilder(
+            """
+            ...........
+            .>>>>a.....
+            .^.........
+            .^....*....
+            .^.....v...
+            .....*.v...
+            .>>>b..>>c.
+            ...........
+            .....*.....
+            .v<<<<<....
+            .>>>>d.....
+            """,
+            {"a": 80, "b": 90, "c": 70, "d": 60},
+        ).to_board()
+        start = time.monotonic()
+        _, stats = rollout.ideal_direction(board, Deadline(100))
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertGreater(sum(s.playouts for s in stats), 1000)
@@ -1,13 +1,17 @@
+import random
 import unittest
 import textwrap
-from typing import Mapping
+from typing import List, Mapping
 
+from src.planning import cells, simulation
 from src.planning.simulation import Simulation
 from tests.board_builder import BoardBuilder
 import src.models as models
 
 
 class TestSimulation(unittest.TestCase):
+    SimulationType = Simulation
+
     def setUp(self):
         board = BoardBuilder(
             """
@@ -25,7 +29,7 @@ class TestSimulation(unittest.TestCase):
                 "d": 42,
             },
         ).to_board()
-        self.sim = Simulation(board)
+        self.sim = self.SimulationType(board)
         self.name_to_id = {}
         for i, name in enumerate(self.sim.names):
             self.name_to_id[name] = i
@@ -128,7 +132,7 @@ class TestSimulation(unittest.TestCase):
         )
 
     def test_is_obvious_death(self):
-        sim = Simulation(BoardBuilder(
+        sim = self.SimulationType(BoardBuilder(
             """
             ....
             ..>a
@@ -142,6 +146,22 @@ class TestSimulation(unittest.TestCase):
         self.assertFalse(sim.is_obvious_death(0, models.UP))
         self.assertFalse(sim.is_obvious_death(0, models.DOWN))
 
+    def test_is_obvious_death_into_body(self):
+        sim = self.SimulationType(BoardBuilder(
+            """
+            .>>>b
+            ..a<<
+            >>c..
+            """,
+            {"a": 100, "b": 100, "c": 100}
+        ).to_board())
+        self.assertTrue(sim.is_obvious_death(0, models.UP), 'Moving into a body should be obvious death.')
+        self.assertTrue(sim.is_obvious_death(0, models.DOWN), 'Moving into a head should be obvious death.')
+        self.assertTrue(sim.is_obvious_death(2, models.UP), 'Moving into a head should be obvious death.')
+        # a's tail moves out of the way in time
+        self.assertFalse(sim.is_obvious_death(1, models.DOWN))
+        self.assertFalse(sim.is_obvious_death(2, models.RIGHT))
+
     def test_move(self):
         self.sim.do_move(self.name_to_id["a"], models.UP)
         self.sim.do_move(self.name_to_id["b"], models.RIGHT)
@@ -272,6 +292,38 @@ class TestSimulation(unittest.TestCase):
             },
         )
 
+    def test_eat_one_of_many_food(self):
+        self.sim = self.SimulationType(
+            BoardBuilder(
+                """
+                *.*.*
+                .*a*.
+                *.^.*
+                .*^*.
+                """,
+                {"a": 10},
+            ).to_board()
+        )
+        self.name_to_id = {"a": 0}
+        food_before = set(self.sim.food)
+        self.sim.do_move(0, models.LEFT)
+        self.sim.do_turn()
+        self.expect_board(
+            """
+            *.*.*
+            .A<*.
+            *.^.*
+            .*.*.
+            """,
+            {"a": 100},
+        )
+        self.assertEqual(
+            set(self.sim.food), food_before - {models.Coord.from_x_y(1, 2)}
+        )
+        self.sim.undo_turn()
+        self.assertEqual(set(self.sim.food), food_before)
+        self.assertEqual(self.sim.healths[0], 10)
+
     def test_starve(self):
         self.sim.do_move(self.name_to_id["a"], models.UP)
         self.sim.do_move(self.name_to_id["b"], models.UP)
@@ -336,6 +388,168 @@ class TestSimulation(unittest.TestCase):
             },
         )
 
+    def hazard_sim(self, hazards, healths, rules=simulation.Rules()) -> Simulation:
+        board = BoardBuilder(
+            """
+            .....
+            .>a*.
+            .....
+            .>b..
+            """,
+            healths,
+        ).to_board()
+        board.hazards = [models.Coord.from_x_y(x, y) for x, y in hazards]
+        return self.SimulationType(board, rules=rules)
+
+    def test_hazard_damage(self):
+        sim = self.hazard_sim([(3, 0), (3, 0), (3, 2)], {"a": 100, "b": 100})
+        sim.do_move(0, models.RIGHT)
+        sim.do_move(1, models.RIGHT)
+        sim.do_turn()
+        # a ate the food in the hazard, b stepped into a double stack
+        self.assertEqual(sim.healths, [100, 100 - 1 - 2 * 14])
+        sim.do_move(0, models.UP)
+        sim.do_move(1, models.UP)
+        sim.do_turn()
+        self.assertEqual(sim.healths, [99, 100 - 1 - 2 * 14 - 1])
+        sim.undo_turn()
+        sim.undo_turn()
+        self.assertEqual(sim.healths, [100, 100])
+
+    def test_hazard_kills(self):
+        sim = self.hazard_sim([(3, 0)], {"a": 100, "b": 10})
+        sim.do_move(0, models.UP)
+        sim.do_move(1, models.RIGHT)
+        sim.do_turn()
+        self.assertEqual(sim.healths, [99, 0])
+        self.assertTrue(sim.snake_is_dead(1))
+        self.assertEqual(sim.num_dead, 1)
+
+    def test_hazard_damage_setting(self):
+        rules = simulation.Rules(hazard_damage_per_turn=50)
+        sim = self.hazard_sim([(3, 0)], {"a": 100, "b": 100}, rules)
+        sim.do_move(0, models.UP)
+        sim.do_move(1, models.RIGHT)
+        sim.do_turn()
+        self.assertEqual(sim.healths, [99, 49])
+
+    def test_royale_shrink(self):
+        # The left column is already hazard, the safe area shrinks every 3
+        # game turns, and the game is on turn 4.
+        rules = simulation.Rules(shrink_every_n_turns=3, start_turn=4)
+        sim = self.hazard_sim([(0, y) for y in range(4)], {"a": 100, "b": 100}, rules)
+        self.assertEqual(len(list(sim.hazards)), 4)
+        sim.do_move(0, models.UP)
+        sim.do_move(1, models.RIGHT)
+        sim.do_turn()
+        self.assertEqual(len(list(sim.hazards)), 4)
+        sim.do_move(0, models.RIGHT)
+        sim.do_move(1, models.RIGHT)
+        sim.do_turn()
+        # Game turn 6, every side of the safe area is assumed to go. That
+        # leaves the middle of columns 2 and 3.
+        safe = {
+            (x, y) for x in range(sim.width) for y in range(sim.height)
+        } - {(c.x, c.y) for c in sim.hazards}
+        self.assertEqual(safe, {(2, 1), (2, 2), (3, 1), (3, 2)})
+        sim.do_move(0, models.RIGHT)
+        sim.do_move(1, models.UP)
+        sim.do_turn()
+        # a is on the top edge, b on the right
+        self.assertEqual(sim.healths, [97 - 14, 97 - 14])
+        sim.undo_turn()
+        sim.undo_turn()
+        self.assertEqual(len(list(sim.hazards)), 4)
+
+    def spawn_sim(self, **rules) -> Simulation:
+        board = BoardBuilder(
+            """
+            ......
+            .>>a..
+            ......
+            ......
+            .>>b..
+            """,
+            {"a": 100, "b": 100},
+        ).to_board()
+        return self.SimulationType(board, rules=simulation.Rules(**rules))
+
+    def play_turns(self, sim: Simulation, turns: int) -> List[List[models.Coord]]:
+        """Move both snakes around in circles, and list the food after each
+        turn."""
+        moves = [models.DOWN, models.LEFT, models.UP, models.RIGHT]
+        food = []
+        for turn in range(turns):
+            sim.do_move(0, moves[turn % 4])
+            sim.do_move(1, moves[turn % 4])
+            sim.do_turn()
+            self.assertEqual(sim.zobrist_hash, sim._compute_hash(sim.food))
+            food.append(sorted(sim.food, key=lambda c: (c.x, c.y)))
+        return food
+
+    def test_no_food_spawns(self):
+        sim = self.spawn_sim()
+        self.assertEqual(self.play_turns(sim, 4), [[]] * 4)
+
+    def test_minimum_food_spawns(self):
+        sim = self.spawn_sim(
+            minimum_food=2,
+            food_spawn_chance=0,
+            food_spawns=simulation.FoodSpawns.SAMPLED,
+        )
+        food = self.play_turns(sim, 4)
+        self.assertEqual([len(f) for f in food], [2] * 4)
+        bodies = {c for body in sim.bodies for c in body}
+        self.assertFalse(bodies & set(food[-1]))
+        while sim.turn > 0:
+            sim.undo_turn()
+        self.assertEqual(list(sim.food), [])
+
+    def test_expected_food_spawns(self):
+        sim = self.spawn_sim(
+            minimum_food=0,
+            food_spawn_chance=50,
+            start_turn=3,
+            food_spawns=simulation.FoodSpawns.EXPECTED,
+        )
+        # Half a food a turn, the first whole one is on game turn 3
+        food = self.play_turns(sim, 4)
+        self.assertEqual([len(f) for f in food], [1, 1, 2, 2])
+
+    def test_moves_dont_place_food(self):
+        food = set()
+        for move in (models.UP, models.DOWN, models.RIGHT):
+            sim = self.spawn_sim(food_spawns=simulation.FoodSpawns.EXPECTED)
+            sim.do_move(0, move)
+            sim.do_move(1, move)
+            sim.do_turn()
+            food.add(tuple(sim.food))
+        self.assertEqual(len(food), 1)
+
+    def test_sampled_food_spawns_repeat(self):
+        sim = self.spawn_sim(
+            minimum_food=0,
+            food_spawn_chance=50,
+            food_spawns=simulation.FoodSpawns.SAMPLED,
+        )
+        food = self.play_turns(sim, 8)
+        self.assertTrue(food[-1])
+        # The same turns played again get the same food
+        while sim.turn > 0:
+            sim.undo_turn()
+        self.assertEqual(self.play_turns(sim, 8), food)
+        # Other seeds get other food
+        seeds = set()
+        for seed in range(5):
+            sim = self.spawn_sim(
+                minimum_food=0,
+                food_spawn_chance=50,
+                food_spawns=simulation.FoodSpawns.SAMPLED,
+                seed=seed,
+            )
+            seeds.add(tuple(map(tuple, self.play_turns(sim, 8))))
+        self.assertGreater(len(seeds), 1)
+
     def test_move_out_of_bounds(self):
         self.sim.do_move(self.name_to_id["a"], models.UP)
         self.sim.do_move(self.name_to_id["b"], models.DOWN)
@@ -537,9 +751,174 @@ class TestSimulation(unittest.TestCase):
                 "d": 42,
             },
         ).to_board()
-        sim = Simulation(board)
+        sim = self.SimulationType(board)
         self.assertMultiLineEqual(
             sim.render(),
             board_text,
             "Render should return the same board that was built.",
         )
+
+    def test_zobrist_hash_incremental(self):
+        rng = random.Random(42)
+        start_hash = self.sim.zobrist_hash
+        hashes = [start_hash]
+        for _ in range(10):
+            for snk_id in self.sim.snake_ids:
+                self.sim.do_move(snk_id, rng.choice(models.CARDINAL_FOUR))
+            self.sim.do_turn()
+            self.assertEqual(
+                self.sim.zobrist_hash,
+                self.sim._compute_hash(self.sim.food),
+                "Incremental hash should match a hash built from scratch.",
+            )
+            hashes.append(self.sim.zobrist_hash)
+        while self.sim.turn > 0:
+            hashes.pop()
+            self.sim.undo_turn()
+            self.assertEqual(self.sim.zobrist_hash, hashes[-1])
+        self.assertEqual(self.sim.zobrist_hash, start_hash)
+
+    def test_zobrist_hash_transposition(self):
+        board = BoardBuilder(
+            """
+            v...
+            a...
+            .>b.
+            ....
+            """,
+            {"a": 100, "b": 100},
+        ).to_board()
+        first = self.SimulationType(board)
+        second = self.SimulationType(board)
+        for a_move, first_b_move, second_b_move in (
+            (models.DOWN, models.UP, models.RIGHT),
+            (models.DOWN, models.RIGHT, models.UP),
+        ):
+            first.do_move(0, a_move)
+            first.do_move(1, first_b_move)
+            first.do_turn()
+            second.do_move(0, a_move)
+            second.do_move(1, second_b_move)
+            second.do_turn()
+
+        # The heads are in the same place, but b's body took different paths.
+        self.assertNotEqual(first.render(), second.render())
+        self.assertNotEqual(first.zobrist_hash, second.zobrist_hash)
+
+        for sim in (first, second):
+            sim.do_move(0, models.RIGHT)
+            sim.do_move(1, models.UP)
+            sim.do_turn()
+
+        # b's tail has moved past where the paths differed.
+        self.assertEqual(first.render(), second.render())
+        self.assertEqual(list(first.healths), [97, 97])
+        self.assertEqual(first.zobrist_hash, second.zobrist_hash)
+
+
+class TestOccupancy(unittest.TestCase):
+    def assertCountsMatchBodies(self, sim: Simulation):
+        occupancy = [0] * len(sim._occupancy)
+        head_counts = [0] * len(sim._head_counts)
+        for body in sim.bodies:
+            head_counts[sim._cells.index(body.head())] += 1
+            for segment in list(body)[1:]:
+                occupancy[sim._cells.index(segment)] += 1
+        self.assertEqual(sim._occupancy, occupancy)
+        self.assertEqual(sim._head_counts, head_counts)
+
+    def test_random_games(self):
+        board = BoardBuilder(
+            """
+            v....vv
+            va<..Cv
+            >>^...d
+            .*.....
+            .....*.
+            ...>>b.
+            """,
+            {
+                "a": 51,
+                "b": 100,
+                "c": 2,
+                "d": 42,
+            },
+        ).to_board()
+        rng = random.Random(4321)
+        for _ in range(50):
+            sim = Simulation(board, max_depth=12)
+            self.assertCountsMatchBodies(sim)
+            for _ in range(12):
+                for snk_id in sim.snake_ids:
+                    sim.do_move(snk_id, rng.choice(models.CARDINAL_FOUR))
+                sim.do_turn()
+                self.assertCountsMatchBodies(sim)
+            while sim.turn > 0:
+                sim.undo_turn()
+                self.assertCountsMatchBodies(sim)
+
+
+class TestParseBoard(unittest.TestCase):
+    BUILDER = BoardBuilder(
+        """
+        v....vv
+        va<..Cv
+        >>^...d
+        .*.....
+        .....*.
+        ...>>b.
+        """,
+        {
+            "a": 51,
+            "b": 100,
+            "c": 2,
+            "d": 42,
+        },
+    )
+
+    def test_matches_board(self):
+        board = self.BUILDER.to_board()
+        parsed = simulation.parse_board(self.BUILDER.to_json())
+        self.assertEqual((parsed.width, parsed.height), (board.width, board.height))
+        self.assertEqual(parsed.food, board.food)
+        self.assertEqual(parsed.hazards, board.hazards)
+        for expected, actual in zip(board.snakes, parsed.snakes):
+            self.assertEqual(actual.id, expected.id)
+            self.assertEqual(actual.name, expected.name)
+            self.assertEqual(actual.health, expected.health)
+            self.assertEqual(actual.body, expected.body)
+        self.assertEqual(Simulation(parsed).render(), Simulation(board).render())
+
+    def test_you_first(self):
+        parsed = simulation.parse_board(self.BUILDER.to_json(), you_id="c_id")
+        self.assertEqual([snk.name for snk in parsed.snakes], ["c", "a", "b", "d"])
+
+    def test_parse_rules(self):
+        data = {
+            "game": {
+                "ruleset": {
+                    "name": "royale",
+                    "version": "v1.2.3",
+                    "settings": {
+                        "hazardDamagePerTurn": 20,
+                        "royale": {"shrinkEveryNTurns": 10},
+                    },
+                }
+            },
+            "turn": 7,
+        }
+        self.assertEqual(
+            simulation.parse_rules(data),
+            simulation.Rules(
+                hazard_damage_per_turn=20, shrink_every_n_turns=10, start_turn=7
+            ),
+        )
+        # Only royale shrinks
+        data["game"]["ruleset"]["name"] = "standard"
+        self.assertEqual(simulation.parse_rules(data).shrink_every_n_turns, 0)
+
+    def test_coords_interned(self):
+        parsed = simulation.parse_board(self.BUILDER.to_json())
+        table = cells.cells_for(parsed.width, parsed.height)
+        for coord in parsed.food + parsed.snakes[0].body:
+            self.assertIs(coord, table.intern(coord))
@@ -70,3 +70,9 @@ class TestTemporalBody(unittest.TestCase):
         self.check_equal(self.tb, [1, 2])
         self.tb.undo_del_tail()
         self.check_equal(self.tb, [1, 2, 3])
+
+    def test_index(self):
+        self.tb.add_head(0)
+        self.assertEqual(self.tb.current_body[1], 1)
+        self.assertEqual(self.tb.current_body[-1], 3)
+        self.assertEqual(self.tb.current_body[-2], 2)
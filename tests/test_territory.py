@@ -0,0 +1,105 @@
+import threading
+import unittest
+
+import src.models as models
+from src.planning.simulation import Simulation
+from src.planning.territory import TerritoryCounter, counter_for
+from tests.board_builder import BoardBuilder
+
+
+class TestTerritoryCounter(unittest.TestCase):
+    def counter(self, sim: Simulation) -> TerritoryCounter:
+        # A fresh counter, so nothing is remembered from other tests.
+        return TerritoryCounter(sim.width, sim.height)
+
+    def test_voronoi_splits_board(self):
+        sim = Simulation(
+            BoardBuilder(
+                """
+                >a...b<
+                """,
+                {"a": 100, "b": 100},
+            ).to_board()
+        )
+        # The middle cell is reached by both on the same turn. Each also gets
+        # its neck back once its tail has gone past.
+        self.assertEqual(self.counter(sim).voronoi(sim), [2, 2])
+
+    def test_voronoi_stops_at_contested_cells(self):
+        sim = Simulation(
+            BoardBuilder(
+                """
+                a.b
+                ^.^
+                ...
+                """,
+                {"a": 100, "b": 100},
+            ).to_board()
+        )
+        # Both reach the top middle cell first, so neither gets past it to
+        # the middle. The bottom row frees up as their tails move away.
+        self.assertEqual(self.counter(sim).voronoi(sim), [2, 2])
+
+    def test_trapped_snake(self):
+        # a is boxed in by its own neck and c's dead body, b has the rest of
+        # the board.
+        sim = Simulation(
+            BoardBuilder(
+                """
+                a>c...
+                ^^....
+                ^^....
+                .^..b.
+                ....^.
+                """,
+                {"a": 100, "b": 100, "c": 0},
+            ).to_board()
+        )
+        counter = self.counter(sim)
+        territory = counter.voronoi(sim)
+        self.assertEqual(territory[0], 0)
+        self.assertGreater(territory[1], 15)
+        self.assertEqual(territory[2], 0)
+        self.assertEqual(counter.reachable_area(sim, 0), 0)
+        self.assertEqual(counter.reachable_area(sim, 2), 0)
+
+    def test_tail_moves_away(self):
+        sim = Simulation(
+            BoardBuilder(
+                """
+                v<<
+                >a^
+                """,
+                {"a": 100},
+            ).to_board()
+        )
+        # Boxed in, but every segment is gone by the time a gets to it.
+        self.assertEqual(self.counter(sim).reachable_area(sim, 0), 5)
+
+    def test_remembers_positions(self):
+        sim = Simulation(
+            BoardBuilder(
+                """
+                >a...b<
+                """,
+                {"a": 100, "b": 100},
+            ).to_board(),
+            max_depth=1,
+        )
+        counter = self.counter(sim)
+        before = counter.voronoi(sim)
+        sim.do_move(0, models.RIGHT)
+        sim.do_move(1, models.LEFT)
+        sim.do_turn()
+        self.assertEqual(counter.voronoi(sim), self.counter(sim).voronoi(sim))
+        sim.undo_turn()
+        self.assertIs(counter.voronoi(sim), before)
+
+    def test_counter_per_thread(self):
+        counter = counter_for(5, 5)
+        self.assertIs(counter_for(5, 5), counter)
+        other = []
+        thread = threading.Thread(target=lambda: other.append(counter_for(5, 5)))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], counter)
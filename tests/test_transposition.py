@@ -0,0 +1,32 @@
+import unittest
+
+from src.planning.transposition import TranspositionTable
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_get_put(self):
+        table = TranspositionTable(size_bits=4)
+        self.assertIsNone(table.get(1234, 2, 3))
+        table.put(1234, 2, 3, "value")
+        self.assertEqual(table.get(1234, 2, 3), "value")
+        self.assertEqual(table.hits, 1)
+        self.assertEqual(table.misses, 1)
+
+    def test_depth_must_match(self):
+        table = TranspositionTable(size_bits=4)
+        table.put(1234, 2, 3, "value")
+        self.assertIsNone(table.get(1234, 2, 4))
+        self.assertIsNone(table.get(1234, 2, 2))
+
+    def test_turn_must_match(self):
+        table = TranspositionTable(size_bits=4)
+        table.put(1234, 2, 3, "value")
+        self.assertIsNone(table.get(1234, 1, 3))
+
+    def test_bounded(self):
+        table = TranspositionTable(size_bits=4)
+        for i in range(100):
+            table.put(i, 0, 1, i)
+        self.assertLessEqual(len(table), 16)
+        # The newest entry always wins its slot.
+        self.assertEqual(table.get(99, 0, 1), 99)
@@ -0,0 +1,91 @@
+import time
+import unittest
+
+import src.models as models
+import src.planning.multi_max as multi_max
+from src.planning.deadline import Deadline
+from src.planning.simulation import Rules
+from src.snakes import worker_pool
+from src.snakes.worker_pool import WorkerPool
+from tests.board_builder import BoardBuilder
+
+
+def fixed_depth_search(board: models.Board, deadline: Deadline, rules: Rules):
+    return multi_max.ideal_direction(board, depth=2, rules=rules), 2
+
+
+def slow_search(board: models.Board, deadline: Deadline, rules: Rules):
+    # Ignores the deadline, like a search with a bug in it.
+    time.sleep(10)
+    return models.UP, 1
+
+
+def failing_search(board: models.Board, deadline: Deadline, rules: Rules):
+    raise ValueError("Can't search this.")
+
+
+def game_board() -> models.Board:
+    return BoardBuilder(
+        """
+        a<.....
+        .......
+        ...*...
+        .......
+        .>>b...
+        """,
+        {
+            "a": 100,
+            "b": 42,
+        },
+    ).to_board()
+
+
+class TestBoardEncoding(unittest.TestCase):
+    def test_round_trip(self):
+        board = game_board()
+        board.hazards = [models.Coord.from_x_y(6, 4)]
+        decoded = worker_pool.decode_board(worker_pool.encode_board(board))
+        self.assertEqual(decoded.width, board.width)
+        self.assertEqual(decoded.height, board.height)
+        self.assertEqual(decoded.food, board.food)
+        self.assertEqual(decoded.hazards, board.hazards)
+        self.assertEqual(len(decoded.snakes), len(board.snakes))
+        for expected, actual in zip(board.snakes, decoded.snakes):
+            self.assertEqual(actual.id, expected.id)
+            self.assertEqual(actual.health, expected.health)
+            self.assertEqual(actual.body, expected.body)
+            self.assertEqual(actual.head, expected.head)
+            self.assertEqual(actual.length, expected.length)
+
+
+class TestWorkerPool(unittest.TestCase):
+    def test_search(self):
+        pool = WorkerPool(fixed_depth_search, 2)
+        self.addCleanup(pool.close)
+        board = game_board()
+        # Long enough to cover the worker starting up.
+        direction, depth = pool.search(board, Deadline(2000))
+        self.assertEqual(direction, multi_max.ideal_direction(board, depth=2))
+        self.assertEqual(depth, 2)
+        self.assertEqual(pool.num_cancelled, 0)
+
+    def test_overrun_is_cancelled(self):
+        pool = WorkerPool(slow_search, 1)
+        self.addCleanup(pool.close)
+        start = time.monotonic()
+        direction, depth = pool.search(game_board(), Deadline(100))
+        # The replacement starts after the move is answered.
+        self.assertLess(time.monotonic() - start, 0.3)
+        self.assertEqual(direction, models.DOWN)
+        self.assertEqual(depth, 0)
+        self.assertEqual(pool.num_cancelled, 1)
+        # The worker was replaced, so the pool can still take moves.
+        pool._idle.put(pool._idle.get(timeout=5))
+
+    def test_failed_search_falls_back(self):
+        pool = WorkerPool(failing_search, 1)
+        self.addCleanup(pool.close)
+        direction, depth = pool.search(game_board(), Deadline(2000))
+        self.assertEqual(direction, models.DOWN)
+        self.assertEqual(depth, 0)
+        self.assertEqual(pool.num_cancelled, 0)